@@ -1,1403 +1,1850 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, session
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-import os
-from datetime import timedelta, datetime, date
-import re
-import csv
-import io
-from typing import Optional, Dict, List, Union, cast, Any, TypeVar, ClassVar
-import logging
-from sqlalchemy import func, Column, Integer, String, Text, Float, Date, DateTime, ForeignKey, desc
-from sqlalchemy.orm import relationship, Mapped, mapped_column
-import random
-import tempfile
-import openai
-from flask_session import Session
-
-try:
-    from config import OPENAI_API_KEY, SECRET_KEY, DATABASE_PATH
-except ImportError:
-    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', 'your-api-key-here')
-    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
-    DATABASE_PATH = os.getenv('DATABASE_PATH', 'instance/samurai.db')
-
-# SQLAlchemy type hints
-T = TypeVar('T')
-
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
-
-# Ensure the instance folder exists
-instance_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
-os.makedirs(instance_path, exist_ok=True)
-
-app = Flask(__name__)
-app.config['SECRET_KEY'] = SECRET_KEY
-
-# Database configuration
-db_path = os.path.join(instance_path, DATABASE_PATH)
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['TEMPLATES_AUTO_RELOAD'] = True
-
-# Session configuration
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
-
-db = SQLAlchemy(app)
-Session(app)
-
-login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login'  # type: ignore
-login_manager.login_message = 'Please login to access this page.'
-login_manager.login_message_category = 'error'
-
-# Configure OpenAI
-openai.api_key = OPENAI_API_KEY
-
-class User(UserMixin, db.Model):
-    __tablename__ = 'users'
-    
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    username: Mapped[str] = mapped_column(String(80), unique=True, nullable=False)
-    email: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
-    password_hash: Mapped[str] = mapped_column(String(256), nullable=False)
-    role: Mapped[str] = mapped_column(String(20), nullable=False, default='user')
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
-    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime)
-
-    def __init__(self, username: str, email: str, password: str) -> None:
-        self.username = username.strip()
-        self.email = email.strip().lower()
-        self.set_password(password)
-
-    def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
-
-    def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
-
-class Software(db.Model):
-    __tablename__ = 'software'
-    
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    name: Mapped[str] = mapped_column(String(100), nullable=False)
-    vendor: Mapped[str] = mapped_column(String(100), nullable=False)
-    description: Mapped[Optional[str]] = mapped_column(Text)
-    license_type: Mapped[str] = mapped_column(String(50), nullable=False)
-    total_licenses: Mapped[int] = mapped_column(Integer, nullable=False)
-    cost_per_license: Mapped[float] = mapped_column(Float, nullable=False)
-    renewal_date: Mapped[date] = mapped_column(Date, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    # Relationships
-    licenses: Mapped[List['License']] = relationship('License', backref='software', lazy=True)
-    
-    def __init__(self, name: str, vendor: str, description: str, license_type: str,
-                 total_licenses: int, cost_per_license: float, renewal_date: date) -> None:
-        self.name = name
-        self.vendor = vendor
-        self.description = description
-        self.license_type = license_type
-        self.total_licenses = total_licenses
-        self.cost_per_license = cost_per_license
-        self.renewal_date = renewal_date
-    
-    @property
-    def used_licenses(self) -> int:
-        return License.query.filter_by(software_id=self.id, status='active').count()
-    
-    @property
-    def usage_percentage(self) -> float:
-        if self.total_licenses == 0:
-            return 0
-        return (self.used_licenses / self.total_licenses) * 100
-    
-    @property
-    def total_cost(self) -> float:
-        return self.total_licenses * self.cost_per_license
-    
-    @property
-    def days_until_renewal(self) -> int:
-        return (self.renewal_date - datetime.now().date()).days
-
-class License(db.Model):
-    __tablename__ = 'licenses'
-    
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    software_id: Mapped[int] = mapped_column(Integer, ForeignKey('software.id'), nullable=False)
-    assigned_to: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('users.id'))
-    status: Mapped[str] = mapped_column(String(20), nullable=False, default='active')
-    assigned_date: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
-    last_used: Mapped[Optional[datetime]] = mapped_column(DateTime)
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    def __init__(self, software_id: int, assigned_to: int, status: str = 'active',
-                 assigned_date: Optional[datetime] = None, last_used: Optional[datetime] = None) -> None:
-        self.software_id = software_id
-        self.assigned_to = assigned_to
-        self.status = status
-        self.assigned_date = assigned_date or datetime.utcnow()
-        self.last_used = last_used
-
-def get_dashboard_stats():
-    """Get statistics for the dashboard."""
-    try:
-        # Get all software
-        software_list = Software.query.all()
-        
-        # Basic stats
-        total_software = len(software_list)
-        total_licenses = sum(s.total_licenses for s in software_list)
-        active_licenses = sum(s.used_licenses for s in software_list)
-        total_cost = sum(s.total_licenses * s.cost_per_license for s in software_list)
-        
-        # License utilization
-        utilization = (active_licenses / total_licenses * 100) if total_licenses > 0 else 0
-        
-        # Compliance metrics
-        thirty_days = datetime.now().date() + timedelta(days=30)
-        today = datetime.now().date()
-        expiring_soon = sum(1 for s in software_list if s.renewal_date <= thirty_days and s.renewal_date > today)
-        expired = sum(1 for s in software_list if s.renewal_date <= today)
-        
-        # Cost metrics
-        avg_cost_per_license = total_cost / total_licenses if total_licenses > 0 else 0
-        potential_savings = sum(
-            (s.total_licenses - s.used_licenses) * s.cost_per_license 
-            for s in software_list 
-            if s.usage_percentage < 30
-        )
-        
-        # License types distribution
-        license_types = {}
-        for s in software_list:
-            license_types[s.license_type] = license_types.get(s.license_type, 0) + 1
-        
-        # Vendor distribution
-        vendor_distribution = {}
-        for s in software_list:
-            vendor_distribution[s.vendor] = vendor_distribution.get(s.vendor, 0) + 1
-        
-        # Usage categories
-        high_usage = sum(1 for s in software_list if s.usage_percentage >= 80)
-        medium_usage = sum(1 for s in software_list if 30 <= s.usage_percentage < 80)
-        low_usage = sum(1 for s in software_list if s.usage_percentage < 30)
-        
-        # Cost categories
-        high_cost = sum(1 for s in software_list if s.cost_per_license * s.total_licenses >= 100000)
-        medium_cost = sum(1 for s in software_list if 10000 <= s.cost_per_license * s.total_licenses < 100000)
-        low_cost = sum(1 for s in software_list if s.cost_per_license * s.total_licenses < 10000)
-        
-        return {
-            'total_software': total_software,
-            'total_licenses': total_licenses,
-            'active_licenses': active_licenses,
-            'total_cost': total_cost,
-            'utilization': utilization,
-            'expiring_soon': expiring_soon,
-            'expired': expired,
-            'avg_cost_per_license': avg_cost_per_license,
-            'potential_savings': potential_savings,
-            'license_types': license_types,
-            'vendor_distribution': vendor_distribution,
-            'usage_categories': {
-                'high': high_usage,
-                'medium': medium_usage,
-                'low': low_usage
-            },
-            'cost_categories': {
-                'high': high_cost,
-                'medium': medium_cost,
-                'low': low_cost
-            }
-        }
-    except Exception as e:
-        logger.error(f"Error getting dashboard stats: {e}")
-        return {
-            'total_software': 0,
-            'total_licenses': 0,
-            'active_licenses': 0,
-            'total_cost': 0,
-            'utilization': 0,
-            'expiring_soon': 0,
-            'expired': 0,
-            'avg_cost_per_license': 0,
-            'potential_savings': 0,
-            'license_types': {},
-            'vendor_distribution': {},
-            'usage_categories': {'high': 0, 'medium': 0, 'low': 0},
-            'cost_categories': {'high': 0, 'medium': 0, 'low': 0}
-        }
-
-def get_top_software():
-    """Get top software by usage."""
-    try:
-        software_list = Software.query.all()
-        # Sort by usage percentage and get top 3
-        sorted_software = sorted(software_list, key=lambda x: x.usage_percentage, reverse=True)
-        return sorted_software[:3]
-    except Exception as e:
-        logger.error(f"Error getting top software: {e}")
-        return []
-
-# Add more sample software data
-def add_sample_software():
-    sample_software = [
-        # High-Value Enterprise Software
-        Software(
-            name='SAP HANA Enterprise',
-            vendor='SAP',
-            description='In-Memory Database Platform',
-            license_type='Per Core',
-            total_licenses=48,
-            cost_per_license=12000.00,
-            renewal_date=datetime.now().date() + timedelta(days=45)
-        ),
-        Software(
-            name='Oracle Cloud Infrastructure',
-            vendor='Oracle',
-            description='Enterprise Cloud Platform',
-            license_type='Per User',
-            total_licenses=2000,
-            cost_per_license=200.00,
-            renewal_date=datetime.now().date() + timedelta(days=15)
-        ),
-        Software(
-            name='Microsoft Azure AD Premium P2',
-            vendor='Microsoft',
-            description='Advanced Identity Protection',
-            license_type='Per User',
-            total_licenses=1500,
-            cost_per_license=18.00,
-            renewal_date=datetime.now().date() + timedelta(days=90)
-        ),
-        
-        # Security Software
-        Software(
-            name='CrowdStrike Falcon Enterprise',
-            vendor='CrowdStrike',
-            description='Endpoint Protection Platform',
-            license_type='Per Endpoint',
-            total_licenses=3000,
-            cost_per_license=85.00,
-            renewal_date=datetime.now().date() + timedelta(days=10)
-        ),
-        Software(
-            name='Palo Alto Prisma Cloud',
-            vendor='Palo Alto Networks',
-            description='Cloud Security Platform',
-            license_type='Per Workload',
-            total_licenses=500,
-            cost_per_license=150.00,
-            renewal_date=datetime.now().date() + timedelta(days=25)
-        ),
-        
-        # Development Tools
-        Software(
-            name='JetBrains All Products Pack',
-            vendor='JetBrains',
-            description='Complete Development Suite',
-            license_type='Per User',
-            total_licenses=200,
-            cost_per_license=649.00,
-            renewal_date=datetime.now().date() + timedelta(days=5)
-        ),
-        Software(
-            name='GitHub Enterprise',
-            vendor='GitHub',
-            description='Enterprise Code Repository',
-            license_type='Per User',
-            total_licenses=1000,
-            cost_per_license=21.00,
-            renewal_date=datetime.now().date() + timedelta(days=180)
-        ),
-        
-        # Analytics and BI
-        Software(
-            name='Snowflake Enterprise',
-            vendor='Snowflake',
-            description='Data Warehouse Platform',
-            license_type='Per Credit',
-            total_licenses=5000,
-            cost_per_license=23.00,
-            renewal_date=datetime.now().date() + timedelta(days=8)
-        ),
-        Software(
-            name='Databricks Unity Catalog',
-            vendor='Databricks',
-            description='Data Lakehouse Platform',
-            license_type='Per DBU',
-            total_licenses=10000,
-            cost_per_license=15.00,
-            renewal_date=datetime.now().date() + timedelta(days=12)
-        ),
-        
-        # Collaboration Tools
-        Software(
-            name='Miro Enterprise',
-            vendor='Miro',
-            description='Visual Collaboration Platform',
-            license_type='Per User',
-            total_licenses=800,
-            cost_per_license=16.00,
-            renewal_date=datetime.now().date() + timedelta(days=60)
-        ),
-        Software(
-            name='Notion Enterprise',
-            vendor='Notion',
-            description='Workspace and Wiki Platform',
-            license_type='Per User',
-            total_licenses=1200,
-            cost_per_license=8.00,
-            renewal_date=datetime.now().date() + timedelta(days=150)
-        ),
-        
-        # Infrastructure Management
-        Software(
-            name='HashiCorp Enterprise Suite',
-            vendor='HashiCorp',
-            description='Infrastructure Automation Suite',
-            license_type='Per Node',
-            total_licenses=300,
-            cost_per_license=200.00,
-            renewal_date=datetime.now().date() + timedelta(days=18)
-        ),
-        Software(
-            name='Kubernetes Enterprise Support',
-            vendor='VMware',
-            description='Container Orchestration Support',
-            license_type='Per Cluster',
-            total_licenses=50,
-            cost_per_license=2000.00,
-            renewal_date=datetime.now().date() + timedelta(days=30)
-        ),
-        
-        # Design and Creative
-        Software(
-            name='Figma Enterprise',
-            vendor='Figma',
-            description='Design Collaboration Platform',
-            license_type='Per Editor',
-            total_licenses=150,
-            cost_per_license=45.00,
-            renewal_date=datetime.now().date() + timedelta(days=75)
-        ),
-        Software(
-            name='AutoCAD Collection',
-            vendor='Autodesk',
-            description='Complete CAD Suite',
-            license_type='Per User',
-            total_licenses=100,
-            cost_per_license=3295.00,
-            renewal_date=datetime.now().date() + timedelta(days=40)
-        ),
-        
-        # Compliance and Security
-        Software(
-            name='Qualys Enterprise',
-            vendor='Qualys',
-            description='Vulnerability Management Platform',
-            license_type='Per Asset',
-            total_licenses=2500,
-            cost_per_license=35.00,
-            renewal_date=datetime.now().date() + timedelta(days=15)
-        ),
-        Software(
-            name='SailPoint IdentityNow',
-            vendor='SailPoint',
-            description='Identity Governance Platform',
-            license_type='Per Identity',
-            total_licenses=3000,
-            cost_per_license=25.00,
-            renewal_date=datetime.now().date() + timedelta(days=20)
-        ),
-        
-        # Customer Support
-        Software(
-            name='Zendesk Enterprise Suite',
-            vendor='Zendesk',
-            description='Customer Service Platform',
-            license_type='Per Agent',
-            total_licenses=200,
-            cost_per_license=199.00,
-            renewal_date=datetime.now().date() + timedelta(days=95)
-        ),
-        Software(
-            name='ServiceNow IT Service Management',
-            vendor='ServiceNow',
-            description='ITSM Platform',
-            license_type='Per Fulfiller',
-            total_licenses=150,
-            cost_per_license=180.00,
-            renewal_date=datetime.now().date() + timedelta(days=110)
-        )
-    ]
-    
-    # Add existing sample software
-    sample_software.extend([
-        # Recently Added Software
-        Software(
-            name='Zoom Enterprise Plus',
-            vendor='Zoom',
-            description='Advanced Enterprise Video Conferencing',
-            license_type='Per Host',
-            total_licenses=800,
-            cost_per_license=35.00,
-            renewal_date=datetime.now().date() + timedelta(days=300)
-        ),
-        Software(
-            name='Microsoft Power BI Pro',
-            vendor='Microsoft',
-            description='Professional Business Intelligence Tool',
-            license_type='Per User',
-            total_licenses=500,
-            cost_per_license=10.00,
-            renewal_date=datetime.now().date() + timedelta(days=250)
-        ),
-        Software(
-            name='AWS EC2 Reserved Instances',
-            vendor='Amazon',
-            description='Reserved EC2 Compute Instances',
-            license_type='Per Instance',
-            total_licenses=100,
-            cost_per_license=500.00,
-            renewal_date=datetime.now().date() + timedelta(days=400)
-        ),
-        Software(
-            name='GitLab Ultimate',
-            vendor='GitLab',
-            description='Complete DevOps Platform',
-            license_type='Per User',
-            total_licenses=300,
-            cost_per_license=99.00,
-            renewal_date=datetime.now().date() + timedelta(days=280)
-        ),
-        # Expiring Software
-        Software(
-            name='Cisco Webex Enterprise',
-            vendor='Cisco',
-            description='Enterprise Collaboration Platform',
-            license_type='Per User',
-            total_licenses=1000,
-            cost_per_license=25.00,
-            renewal_date=datetime.now().date() + timedelta(days=15)
-        ),
-        Software(
-            name='Symantec Endpoint Protection',
-            vendor='Broadcom',
-            description='Enterprise Security Solution',
-            license_type='Per Device',
-            total_licenses=2000,
-            cost_per_license=45.00,
-            renewal_date=datetime.now().date() + timedelta(days=20)
-        ),
-        Software(
-            name='Citrix Virtual Apps',
-            vendor='Citrix',
-            description='Application Virtualization',
-            license_type='Per User',
-            total_licenses=500,
-            cost_per_license=300.00,
-            renewal_date=datetime.now().date() + timedelta(days=25)
-        ),
-        Software(
-            name='New Relic Pro',
-            vendor='New Relic',
-            description='Application Performance Monitoring',
-            license_type='Per Host',
-            total_licenses=150,
-            cost_per_license=75.00,
-            renewal_date=datetime.now().date() + timedelta(days=10)
-        ),
-        # Expired Software
-        Software(
-            name='Oracle WebLogic Server',
-            vendor='Oracle',
-            description='Enterprise Application Server',
-            license_type='Per Core',
-            total_licenses=32,
-            cost_per_license=4500.00,
-            renewal_date=datetime.now().date() - timedelta(days=15)
-        ),
-        Software(
-            name='IBM Db2',
-            vendor='IBM',
-            description='Enterprise Database',
-            license_type='Per Core',
-            total_licenses=16,
-            cost_per_license=7800.00,
-            renewal_date=datetime.now().date() - timedelta(days=30)
-        ),
-        Software(
-            name='SolarWinds NPM',
-            vendor='SolarWinds',
-            description='Network Performance Monitor',
-            license_type='Per Device',
-            total_licenses=100,
-            cost_per_license=150.00,
-            renewal_date=datetime.now().date() - timedelta(days=5)
-        ),
-        Software(
-            name='Trend Micro Deep Security',
-            vendor='Trend Micro',
-            description='Server Security Platform',
-            license_type='Per Server',
-            total_licenses=50,
-            cost_per_license=250.00,
-            renewal_date=datetime.now().date() - timedelta(days=8)
-        ),
-        # Actively Used Software
-        Software(
-            name='Atlassian Confluence',
-            vendor='Atlassian',
-            description='Team Collaboration Software',
-            license_type='Per User',
-            total_licenses=1000,
-            cost_per_license=5.00,
-            renewal_date=datetime.now().date() + timedelta(days=180)
-        ),
-        Software(
-            name='Datadog Enterprise',
-            vendor='Datadog',
-            description='Infrastructure Monitoring',
-            license_type='Per Host',
-            total_licenses=200,
-            cost_per_license=35.00,
-            renewal_date=datetime.now().date() + timedelta(days=150)
-        ),
-        Software(
-            name='PagerDuty Enterprise',
-            vendor='PagerDuty',
-            description='Incident Management Platform',
-            license_type='Per User',
-            total_licenses=300,
-            cost_per_license=39.00,
-            renewal_date=datetime.now().date() + timedelta(days=200)
-        ),
-        Software(
-            name='Okta Enterprise',
-            vendor='Okta',
-            description='Identity Management',
-            license_type='Per User',
-            total_licenses=1500,
-            cost_per_license=25.00,
-            renewal_date=datetime.now().date() + timedelta(days=220)
-        )
-    ])
-    
-    return sample_software
-
-def init_db():
-    """Initialize the database and create admin user if it doesn't exist."""
-    try:
-        # Create database directory if it doesn't exist
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        
-        # Create all tables
-        with app.app_context():
-            db.create_all()
-            
-            # Check if admin user exists
-            admin = User.query.filter_by(username='admin').first()
-            if not admin:
-                # Create admin user
-                admin = User(
-                    username='admin',
-                    email='admin@samurai.com',
-                    password='Admin@123'
-                )
-                admin.role = 'admin'
-                db.session.add(admin)
-                
-                # Add regular users for demo
-                demo_users = [
-                    User(username='john.doe', email='john.doe@company.com', password='User@123'),
-                    User(username='jane.smith', email='jane.smith@company.com', password='User@123'),
-                    User(username='bob.wilson', email='bob.wilson@company.com', password='User@123'),
-                    User(username='alice.brown', email='alice.brown@company.com', password='User@123'),
-                ]
-                for user in demo_users:
-                    db.session.add(user)
-                
-                # Add sample software data if none exists
-                if Software.query.count() == 0:
-                    # Add existing sample software
-                    sample_software = add_sample_software()
-                    
-                    # Add software to database
-                    for software in sample_software:
-                        db.session.add(software)
-                    db.session.commit()
-                    
-                    # Add sample license assignments
-                    users = User.query.all()
-                    software_list = Software.query.all()
-                    
-                    # Create license assignments with varying usage patterns
-                    for software in software_list:
-                        # Calculate number of licenses to assign (60-90% of total)
-                        num_licenses = int(software.total_licenses * random.uniform(0.6, 0.9))
-                        
-                        for _ in range(num_licenses):
-                            user = random.choice(users)
-                            license = License(
-                                software_id=software.id,
-                                assigned_to=user.id,
-                                status='active',
-                                assigned_date=datetime.now() - timedelta(days=random.randint(1, 180)),
-                                last_used=datetime.now() - timedelta(days=random.randint(0, 30))
-                            )
-                            db.session.add(license)
-                    
-                    db.session.commit()
-                    logger.info("Admin user and sample data created successfully!")
-                    logger.info(f"Database initialized at: {db_path}")
-                
-    except Exception as e:
-        logger.error(f"Error initializing database: {e}")
-        if os.path.exists(db_path):
-            logger.info("Removing corrupted database file...")
-            os.remove(db_path)
-        if 'admin' in locals():
-            db.session.rollback()
-        raise
-
-@login_manager.user_loader
-def load_user(user_id: str) -> Optional[User]:
-    if not user_id:
-        return None
-    try:
-        return db.session.get(User, int(user_id))
-    except Exception as e:
-        logger.error(f"Error loading user: {e}")
-        return None
-
-@app.before_request
-def before_request():
-    session.permanent = True  # Use permanent session
-    app.permanent_session_lifetime = timedelta(days=7)  # Set session lifetime
-
-@app.route('/')
-def index():
-    if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
-    return redirect(url_for('login'))
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
-        
-    if request.method == 'POST':
-        username = request.form.get('username', '').strip()
-        email = request.form.get('email', '').strip()
-        password = request.form.get('password', '').strip()
-        
-        logger.debug(f"Registration attempt - Username: {username}, Email: {email}")
-        
-        # Validate all fields are present
-        if not username:
-            flash('Username is required', 'error')
-            return redirect(url_for('register'))
-        if not email:
-            flash('Email is required', 'error')
-            return redirect(url_for('register'))
-        if not password:
-            flash('Password is required', 'error')
-            return redirect(url_for('register'))
-        
-        # Validate password length
-        if len(password) < 6:
-            flash('Password must be at least 6 characters long', 'error')
-            return redirect(url_for('register'))
-        
-        try:
-            # Check username
-            if User.query.filter_by(username=username).first():
-                flash('Username already exists', 'error')
-                return redirect(url_for('register'))
-            
-            # Check email
-            if User.query.filter_by(email=email.lower()).first():
-                flash('Email already registered', 'error')
-                return redirect(url_for('register'))
-            
-            # Create new user
-            user = User(
-                username=username,
-                email=email,
-                password=password
-            )
-            db.session.add(user)
-            db.session.commit()
-            logger.info(f"New user registered successfully: {username}")
-            
-            flash('Registration successful! Please login.', 'success')
-            return redirect(url_for('login'))
-            
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Registration error: {e}")
-            flash('An error occurred during registration. Please try again.', 'error')
-            return redirect(url_for('register'))
-    
-    return render_template('register.html')
-
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
-    
-    if request.method == 'POST':
-        username = request.form.get('username')
-        password = request.form.get('password')
-        remember = bool(request.form.get('remember'))
-        
-        user = User.query.filter_by(username=username).first()
-        if user and user.check_password(password):
-            login_user(user, remember=remember)
-            next_page = request.args.get('next')
-            if next_page:
-                return redirect(next_page)
-            return redirect(url_for('dashboard'))
-        flash('Invalid username or password', 'error')
-    
-    return render_template('login.html')
-
-@app.route('/logout')
-@login_required
-def logout():
-    logout_user()
-    flash('You have been logged out successfully.', 'success')
-    return redirect(url_for('login'))
-
-@app.route('/dashboard')
-@login_required
-def dashboard():
-    try:
-        # Get basic stats
-        software_list = Software.query.all()
-        total_software = len(software_list)
-        total_licenses = sum(s.total_licenses for s in software_list)
-        used_licenses = sum(s.used_licenses for s in software_list)
-        utilization = (used_licenses / total_licenses * 100) if total_licenses > 0 else 0
-
-        # Format stats for display
-        stats = {
-            'total_software': total_software,
-            'total_licenses': total_licenses,
-            'used_licenses': used_licenses,
-            'utilization': round(utilization, 2)
-        }
-
-        # Get top software by usage
-        top_software = sorted(software_list, key=lambda x: x.used_licenses, reverse=True)[:5]
-
-        return render_template('dashboard.html', 
-                            stats=stats,
-                            top_software=top_software)
-    except Exception as e:
-        logger.error(f"Dashboard error: {str(e)}")
-        flash('Error loading dashboard', 'error')
-        return render_template('dashboard.html', 
-                            stats={'total_software': 0, 'total_licenses': 0, 'used_licenses': 0, 'utilization': 0},
-                            top_software=[])
-
-@app.route('/software-inventory')
-@login_required
-def software_inventory():
-    try:
-        filter_type = request.args.get('filter', 'all')
-        page = request.args.get('page', 1, type=int)
-        per_page = 12
-        
-        logger.info(f"Software inventory accessed by user: {current_user.username}, filter: {filter_type}, page: {page}")
-        
-        # Get all software first to avoid multiple database queries
-        try:
-            all_software = Software.query.all()
-            if not all_software:
-                logger.warning("No software found in database")
-                flash('No software found in the inventory.', 'info')
-                return render_template('software_inventory.html',
-                                    software_list=[],
-                                    filter_type=filter_type,
-                                    page=1,
-                                    per_page=per_page,
-                                    total=0,
-                                    has_next=False,
-                                    has_prev=False,
-                                    pages=1)
-        except Exception as e:
-            logger.error(f"Error querying software: {e}")
-            flash('Error accessing software inventory.', 'error')
-            return redirect(url_for('dashboard'))
-        
-        # Get current date for comparisons
-        today = datetime.now().date()
-        thirty_days = today + timedelta(days=30)
-        
-        try:
-            if filter_type == 'active':
-                # Get software with usage > 70%
-                filtered_software = [s for s in all_software if s.usage_percentage > 70]
-                filtered_software = sorted(filtered_software, key=lambda x: x.usage_percentage, reverse=True)
-            elif filter_type == 'expiring':
-                # Get software expiring in next 30 days
-                filtered_software = [s for s in all_software 
-                                   if s.renewal_date <= thirty_days and s.renewal_date > today]
-                filtered_software = sorted(filtered_software, key=lambda x: x.renewal_date)
-            elif filter_type == 'expired':
-                # Get expired software
-                filtered_software = [s for s in all_software if s.renewal_date <= today]
-                filtered_software = sorted(filtered_software, key=lambda x: x.renewal_date, reverse=True)
-            else:
-                # For 'all' view, we'll get different categories
-                active_software = [s for s in all_software if s.usage_percentage > 70]
-                active_software = sorted(active_software, key=lambda x: x.usage_percentage, reverse=True)[:8]
-                
-                expiring_software = [s for s in all_software 
-                                   if s.renewal_date <= thirty_days and s.renewal_date > today]
-                expiring_software = sorted(expiring_software, key=lambda x: x.renewal_date)[:8]
-                
-                expired_software = [s for s in all_software if s.renewal_date <= today]
-                expired_software = sorted(expired_software, key=lambda x: x.renewal_date, reverse=True)[:8]
-                
-                return render_template('software_inventory.html',
-                                    active_software=active_software,
-                                    expiring_software=expiring_software,
-                                    expired_software=expired_software,
-                                    filter_type=filter_type,
-                                    page=1,
-                                    per_page=per_page,
-                                    total=len(all_software),
-                                    has_next=False,
-                                    has_prev=False,
-                                    pages=1)
-            
-            # Manual pagination for filtered results
-            total = len(filtered_software)
-            start = (page - 1) * per_page
-            end = start + per_page
-            paginated_software = filtered_software[start:end] if start < total else []
-            
-            return render_template('software_inventory.html',
-                                software_list=paginated_software,
-                                filter_type=filter_type,
-                                page=page,
-                                per_page=per_page,
-                                total=total,
-                                has_next=end < total,
-                                has_prev=page > 1,
-                                pages=(total + per_page - 1) // per_page)
-                                
-        except Exception as e:
-            logger.error(f"Error processing software inventory: {e}")
-            flash('Error processing software inventory.', 'error')
-            return redirect(url_for('dashboard'))
-                            
-    except Exception as e:
-        logger.error(f"Unhandled error in software inventory: {e}")
-        flash('An error occurred while loading the software inventory.', 'error')
-        return redirect(url_for('dashboard'))
-
-@app.route('/user-management')
-@login_required
-def user_management():
-    page = request.args.get('page', 1, type=int)
-    per_page = 10
-
-    # Get users with pagination
-    users = User.query.order_by(User.created_at.desc()).paginate(page=page, per_page=per_page)
-
-    # Calculate statistics
-    total_users = User.query.count()
-    admin_users = User.query.filter_by(role='admin').count()
-    
-    # Users active in last 24 hours
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    active_users = User.query.filter(User.last_login >= yesterday).count()
-    
-    # New users this month
-    first_of_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    new_users = User.query.filter(User.created_at >= first_of_month).count()
-
-    return render_template('user_management.html',
-                         users=users,
-                         total_users=total_users,
-                         admin_users=admin_users,
-                         active_users=active_users,
-                         new_users=new_users,
-                         now=datetime.utcnow(),
-                         pages=users.pages,
-                         current_page=page,
-                         has_prev=users.has_prev,
-                         has_next=users.has_next,
-                         prev_num=users.prev_num,
-                         next_num=users.next_num)
-
-@app.route('/reports')
-@login_required
-def reports():
-    report_type = request.args.get('type', 'general')
-    
-    # Get all software data
-    software_list = Software.query.all()
-    
-    # Calculate summary statistics
-    total_software = len(software_list)
-    total_cost = sum(s.total_cost for s in software_list)
-    total_licenses = sum(s.total_licenses for s in software_list)
-    used_licenses = sum(s.used_licenses for s in software_list)
-    avg_usage = sum(s.usage_percentage for s in software_list) / len(software_list) if software_list else 0
-    
-    # Get expiring licenses
-    thirty_days = datetime.now().date() + timedelta(days=30)
-    # type: ignore[arg-type]
-    expiring_soon = Software.query.filter(Software.renewal_date <= thirty_days).all()
-    
-    # Get underutilized software (less than 30% usage)
-    underutilized = [s for s in software_list if s.usage_percentage < 30]
-    
-    return render_template('reports.html',
-                         report_type=report_type,
-                         software_list=software_list,
-                         total_software=total_software,
-                         total_cost=total_cost,
-                         total_licenses=total_licenses,
-                         used_licenses=used_licenses,
-                         avg_usage=avg_usage,
-                         expiring_soon=expiring_soon,
-                         underutilized=underutilized)
-
-@app.route('/api/export-report')
-@login_required
-def export_report():
-    try:
-        software_list = Software.query.all()
-        
-        # Create a StringIO object to write CSV data
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write headers
-        writer.writerow([
-            'Software Name', 'Vendor', 'Total Licenses', 'Used Licenses',
-            'Usage %', 'Cost Per License', 'Total Cost', 'Renewal Date',
-            'Days Until Renewal'
-        ])
-        
-        # Write data
-        for software in software_list:
-            writer.writerow([
-                software.name,
-                software.vendor,
-                software.total_licenses,
-                software.used_licenses,
-                f"{software.usage_percentage:.1f}%",
-                f"${software.cost_per_license:,.2f}",
-                f"${software.total_cost:,.2f}",
-                software.renewal_date.strftime('%Y-%m-%d'),
-                software.days_until_renewal
-            ])
-        
-        # Prepare the output
-        output.seek(0)
-        return send_file(
-            io.BytesIO(output.getvalue().encode('utf-8')),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name='SAMurAI_Report.csv'
-        )
-            
-    except Exception as e:
-        logger.error(f"Error exporting report: {e}")
-        flash('An error occurred while exporting the report.', 'error')
-        return redirect(url_for('reports'))
-
-@app.route('/api/users', methods=['POST'])
-@login_required
-def add_user():
-    if current_user.role != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-
-    data = request.get_json()
-    
-    if not all(key in data for key in ['username', 'email', 'password', 'role']):
-        return jsonify({'error': 'Missing required fields'}), 400
-    
-    try:
-        # Check if username exists
-        if User.query.filter_by(username=data['username']).first():
-            return jsonify({'error': 'Username already exists'}), 400
-        
-        # Check if email exists
-        if User.query.filter_by(email=data['email']).first():
-            return jsonify({'error': 'Email already exists'}), 400
-        
-        # Create new user
-        user = User(
-            username=data['username'],
-            email=data['email'],
-            password=data['password']
-        )
-        user.role = data['role']
-        
-        db.session.add(user)
-        db.session.commit()
-        
-        return jsonify({
-            'message': 'User created successfully',
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'role': user.role
-            }
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Error creating user: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@app.route('/api/users/<int:user_id>', methods=['PUT'])
-@login_required
-def update_user(user_id):
-    if current_user.role != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    user = User.query.get_or_404(user_id)
-    data = request.get_json()
-    
-    try:
-        if 'username' in data:
-            existing = User.query.filter_by(username=data['username']).first()
-            if existing and existing.id != user_id:
-                return jsonify({'error': 'Username already exists'}), 400
-            user.username = data['username']
-        
-        if 'email' in data:
-            existing = User.query.filter_by(email=data['email']).first()
-            if existing and existing.id != user_id:
-                return jsonify({'error': 'Email already exists'}), 400
-            user.email = data['email']
-        
-        if 'password' in data:
-            user.set_password(data['password'])
-        
-        if 'role' in data:
-            # Prevent changing own role or last admin
-            if user_id == current_user.id:
-                return jsonify({'error': 'Cannot change own role'}), 400
-            if user.role == 'admin' and data['role'] != 'admin':
-                admin_count = User.query.filter_by(role='admin').count()
-                if admin_count <= 1:
-                    return jsonify({'error': 'Cannot remove last admin'}), 400
-            user.role = data['role']
-        
-        db.session.commit()
-        return jsonify({
-            'message': 'User updated successfully',
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'role': user.role
-            }
-        })
-        
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Error updating user: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@app.route('/api/users/<int:user_id>', methods=['DELETE'])
-@login_required
-def delete_user(user_id):
-    if current_user.role != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    if user_id == current_user.id:
-        return jsonify({'error': 'Cannot delete own account'}), 400
-    
-    user = User.query.get_or_404(user_id)
-    
-    try:
-        # Prevent deleting last admin
-        if user.role == 'admin':
-            admin_count = User.query.filter_by(role='admin').count()
-            if admin_count <= 1:
-                return jsonify({'error': 'Cannot delete last admin'}), 400
-        
-        db.session.delete(user)
-        db.session.commit()
-        return jsonify({'message': 'User deleted successfully'})
-        
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Error deleting user: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@app.route('/api/software', methods=['POST'])
-@login_required
-def add_software():
-    if current_user.role != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-
-    data = request.get_json()
-    
-    required_fields = ['name', 'vendor', 'license_type', 'total_licenses', 'cost_per_license', 'renewal_date']
-    if not all(key in data for key in required_fields):
-        return jsonify({'error': 'Missing required fields'}), 400
-    
-    try:
-        # Check if software exists
-        if Software.query.filter_by(name=data['name'], vendor=data['vendor']).first():
-            return jsonify({'error': 'Software already exists'}), 400
-        
-        # Create new software
-        software = Software(
-            name=data['name'],
-            vendor=data['vendor'],
-            description=data.get('description', ''),
-            license_type=data['license_type'],
-            total_licenses=data['total_licenses'],
-            cost_per_license=data['cost_per_license'],
-            renewal_date=datetime.strptime(data['renewal_date'], '%Y-%m-%d').date()
-        )
-        
-        db.session.add(software)
-        db.session.commit()
-        
-        return jsonify({
-            'message': 'Software added successfully',
-            'software': {
-                'id': software.id,
-                'name': software.name,
-                'vendor': software.vendor,
-                'description': software.description,
-                'license_type': software.license_type,
-                'total_licenses': software.total_licenses,
-                'cost_per_license': software.cost_per_license,
-                'renewal_date': software.renewal_date.strftime('%Y-%m-%d')
-            }
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Error adding software: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@app.route('/api/software/<int:software_id>', methods=['PUT'])
-@login_required
-def update_software(software_id):
-    if current_user.role != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    software = Software.query.get_or_404(software_id)
-    data = request.get_json()
-    
-    try:
-        if 'name' in data:
-            existing = Software.query.filter_by(name=data['name'], vendor=software.vendor).first()
-            if existing and existing.id != software_id:
-                return jsonify({'error': 'Software already exists'}), 400
-            software.name = data['name']
-        
-        if 'vendor' in data:
-            existing = Software.query.filter_by(name=software.name, vendor=data['vendor']).first()
-            if existing and existing.id != software_id:
-                return jsonify({'error': 'Software already exists'}), 400
-            software.vendor = data['vendor']
-        
-        if 'description' in data:
-            software.description = data['description']
-        
-        if 'license_type' in data:
-            software.license_type = data['license_type']
-        
-        if 'total_licenses' in data:
-            software.total_licenses = data['total_licenses']
-        
-        if 'cost_per_license' in data:
-            software.cost_per_license = data['cost_per_license']
-        
-        if 'renewal_date' in data:
-            software.renewal_date = datetime.strptime(data['renewal_date'], '%Y-%m-%d').date()
-        
-        db.session.commit()
-        return jsonify({
-            'message': 'Software updated successfully',
-            'software': {
-                'id': software.id,
-                'name': software.name,
-                'vendor': software.vendor,
-                'description': software.description,
-                'license_type': software.license_type,
-                'total_licenses': software.total_licenses,
-                'cost_per_license': software.cost_per_license,
-                'renewal_date': software.renewal_date.strftime('%Y-%m-%d')
-            }
-        })
-        
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Error updating software: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@app.route('/api/software/<int:software_id>', methods=['DELETE'])
-@login_required
-def delete_software(software_id):
-    if current_user.role != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    software = Software.query.get_or_404(software_id)
-    
-    try:
-        # Check if software has active licenses
-        active_licenses = License.query.filter_by(software_id=software_id, status='active').count()
-        if active_licenses > 0:
-            return jsonify({'error': f'Cannot delete software with {active_licenses} active licenses'}), 400
-        
-        db.session.delete(software)
-        db.session.commit()
-        return jsonify({'message': 'Software deleted successfully'})
-        
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Error deleting software: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@app.route('/api/software/search', methods=['GET'])
-@login_required
-def search_software():
-    query = request.args.get('q', '').strip()
-    if not query:
-        return jsonify({'error': 'Search query is required'}), 400
-    
-    try:
-        # Search in name, vendor, and description
-        software_list = Software.query.filter(
-            db.or_(
-                cast(Column[str], Software.name).ilike(f'%{query}%'),  # type: ignore[attr-defined]
-                cast(Column[str], Software.vendor).ilike(f'%{query}%'),  # type: ignore[attr-defined]
-                cast(Column[str], Software.description).ilike(f'%{query}%')  # type: ignore[attr-defined]
-            )
-        ).all()
-        
-        return jsonify({
-            'results': [{
-                'id': s.id,
-                'name': s.name,
-                'vendor': s.vendor,
-                'description': s.description,
-                'license_type': s.license_type,
-                'total_licenses': s.total_licenses,
-                'used_licenses': s.used_licenses,
-                'usage_percentage': s.usage_percentage,
-                'cost_per_license': s.cost_per_license,
-                'total_cost': s.total_cost,
-                'renewal_date': s.renewal_date.strftime('%Y-%m-%d'),
-                'days_until_renewal': s.days_until_renewal
-            } for s in software_list]
-        })
-        
-    except Exception as e:
-        logger.error(f"Error searching software: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
-
-@app.route('/ai-dashboard')
-@login_required
-def ai_dashboard():
-    return render_template('ai_dashboard.html')
-
-@app.route('/api/ai-chat', methods=['POST'])
-@login_required
-def ai_chat():
-    try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-            
-        message = data.get('message', '')
-        if not message:
-            return jsonify({'error': 'Message is required'}), 400
-
-        # Get relevant software data
-        software_list = Software.query.all()
-        
-        # Prepare context about software inventory
-        context = {
-            'total_software': len(software_list),
-            'total_licenses': sum(s.total_licenses for s in software_list),
-            'used_licenses': sum(s.used_licenses for s in software_list),
-            'expiring_soon': sum(1 for s in software_list if s.days_until_renewal <= 30 and s.days_until_renewal > 0),
-            'expired': sum(1 for s in software_list if s.days_until_renewal <= 0),
-            'high_usage': sum(1 for s in software_list if s.usage_percentage >= 80),
-            'low_usage': sum(1 for s in software_list if s.usage_percentage < 30),
-            'software_details': [
-                {
-                    'name': s.name,
-                    'vendor': s.vendor,
-                    'total_licenses': s.total_licenses,
-                    'used_licenses': s.used_licenses,
-                    'usage_percentage': s.usage_percentage,
-                    'days_until_renewal': s.days_until_renewal,
-                    'cost_per_license': s.cost_per_license,
-                    'total_cost': s.total_cost
-                }
-                for s in software_list
-            ]
-        }
-
-        # Create system message with context
-        system_message = f"""You are SAMurAI, an AI assistant for Software Asset Management. 
-        Here is the current state of the software assets:
-        
-        Overview:
-        - Total Software: {context['total_software']}
-        - Total Licenses: {context['total_licenses']}
-        - Used Licenses: {context['used_licenses']}
-        - Licenses Expiring in 30 days: {context['expiring_soon']}
-        - Expired Licenses: {context['expired']}
-        - High Usage Software (>80%): {context['high_usage']}
-        - Low Usage Software (<30%): {context['low_usage']}
-        
-        You have access to detailed information about each software including name, vendor, 
-        license counts, usage, costs, and renewal dates. Provide specific, data-driven insights 
-        and recommendations based on this information.
-        
-        When discussing costs, always format them as currency with $ symbol and commas.
-        When discussing percentages, always include the % symbol and use one decimal place.
-        Be concise but informative in your responses."""
-
-        # Call OpenAI API
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": message}
-            ],
-            max_tokens=250,
-            temperature=0.7
-        )
-
-        ai_response = response.choices[0].message.content
-        return jsonify({'response': ai_response})
-
-    except Exception as e:
-        logger.error(f"Error in AI chat: {e}")
-        return jsonify({'error': 'An error occurred processing your request'}), 500
-
-# Initialize database when running the app
-if __name__ == '__main__':
-    init_db()  # Initialize database and create admin user
-    app.run(debug=True) 
\ No newline at end of file
+from flask import Flask, Blueprint, Response, render_template, request, redirect, url_for, flash, jsonify, session, stream_with_context
+from flask_sqlalchemy import SQLAlchemy
+from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from werkzeug.security import generate_password_hash, check_password_hash
+import os
+import time
+import threading
+from datetime import timedelta, datetime, date
+import re
+from typing import Optional, Dict, List, Union, cast, Any, TypeVar, ClassVar
+import logging
+from collections import Counter
+from functools import cached_property, lru_cache
+from sqlalchemy import event, func, select, insert, exists, bindparam, and_, or_, case, cast as sql_cast, text, table, column, Column, Integer, String, Text, Float, Date, DateTime, ForeignKey, Index, desc
+from sqlalchemy.orm import relationship, Mapped, mapped_column, column_property
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import IntegrityError, OperationalError
+import random
+from flask_caching import Cache
+from flask.json.provider import DefaultJSONProvider
+import orjson
+
+try:
+    from config import OPENAI_API_KEY, SECRET_KEY, DATABASE_PATH
+except ImportError:
+    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', 'your-api-key-here')
+    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
+    DATABASE_PATH = os.getenv('DATABASE_PATH', 'instance/samurai.db')
+
+try:
+    from config import PASSWORD_HASH_METHOD
+except ImportError:
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+
+# Werkzeug expands short method names ('pbkdf2' -> 'pbkdf2:sha256:600000'), so
+# stored hashes are compared against the prefix it actually writes
+PASSWORD_HASH_PREFIX = generate_password_hash('', method=PASSWORD_HASH_METHOD).split('$', 1)[0]
+
+# SQLAlchemy type hints
+T = TypeVar('T')
+
+# Registration validation patterns
+USERNAME_RE = re.compile(r'^[A-Za-z0-9._-]{3,80}$')
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# AI chat keyword extraction for retrieving relevant software; keywords must
+# equal a whole word of a software name or vendor to count as a mention
+KEYWORD_RE = re.compile(r'[a-z0-9]+')
+AI_CONTEXT_MIN_KEYWORD_LENGTH = 3
+AI_CONTEXT_STOP_WORDS = frozenset({
+    'about', 'all', 'and', 'any', 'are', 'can', 'could', 'does', 'enterprise',
+    'for', 'from', 'give', 'has', 'have', 'how', 'into', 'its', 'least', 'less',
+    'license', 'licenses', 'list', 'many', 'more', 'most', 'much', 'need',
+    'not', 'our', 'should', 'show', 'software', 'some', 'soon', 'tell', 'than',
+    'that', 'the', 'their', 'them', 'there', 'these', 'they', 'this', 'those',
+    'use', 'used', 'was', 'were', 'what', 'when', 'where', 'which', 'who',
+    'why', 'will', 'with', 'would', 'you', 'your'
+})
+AI_CONTEXT_MAX_KEYWORDS = 8
+AI_CONTEXT_MAX_SOFTWARE = 10
+AI_CONTEXT_FALLBACK_SOFTWARE = 5
+
+# Bound how long a chat request can hold a worker waiting on OpenAI
+# (the client defaults are a 10 minute timeout with two retries)
+AI_CHAT_TIMEOUT = 30.0
+AI_CHAT_MAX_RETRIES = 1
+
+# Renewals due within this many days count as expiring soon
+RENEWAL_WARNING_DAYS = 30
+
+# Software search bounds
+SEARCH_MAX_QUERY_LENGTH = 64
+SEARCH_MAX_RESULTS = 50
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Ensure the instance folder exists
+instance_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+os.makedirs(instance_path, exist_ok=True)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson; dates serialize natively as ISO strings."""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if 'indent' in kwargs:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        # Hooks such as the session serializer's object_hook need the stdlib decoder
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+app = Flask(__name__)
+app.json = OrjsonProvider(app)
+app.config['SECRET_KEY'] = SECRET_KEY
+
+# Database configuration
+db_path = os.path.join(instance_path, DATABASE_PATH)
+app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Pool of SQLite connections so request threads read in parallel under WAL
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'poolclass': QueuePool,
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_pre_ping': True,
+    'connect_args': {'check_same_thread': False}
+}
+# Reload templates only in debug mode; otherwise compiled templates are reused
+app.config['TEMPLATES_AUTO_RELOAD'] = None
+
+# Session configuration (Flask's signed-cookie sessions; the payload is only the login id and flashes)
+app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
+# Only send the cookie when the session changes instead of on every response
+app.config['SESSION_REFRESH_EACH_REQUEST'] = False
+
+# Cache configuration
+app.config['CACHE_TYPE'] = 'SimpleCache'
+DASHBOARD_CACHE_KEY = 'dash_stats'
+DASHBOARD_CACHE_TIMEOUT = 60  # seconds
+
+db = SQLAlchemy(app)
+cache = Cache(app)
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Enable WAL journaling and tune SQLite for concurrent reads on every new connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA cache_size=-64000')  # ~64MB page cache
+    cursor.execute('PRAGMA mmap_size=268435456')  # 256MB memory-mapped I/O
+    cursor.close()
+
+with app.app_context():
+    event.listen(db.engine, 'connect', set_sqlite_pragmas)
+
+login_manager = LoginManager()
+login_manager.init_app(app)
+login_manager.login_view = 'login'  # type: ignore
+login_manager.login_message = 'Please login to access this page.'
+login_manager.login_message_category = 'error'
+
+@lru_cache(maxsize=1)
+def get_openai_client():
+    """Import and configure the OpenAI client on first use to keep it off startup.
+    
+    The client is shared so its HTTP connection pool stays warm between chats.
+    """
+    from openai import OpenAI
+    return OpenAI(api_key=OPENAI_API_KEY, timeout=AI_CHAT_TIMEOUT, max_retries=AI_CHAT_MAX_RETRIES)
+
+class User(UserMixin, db.Model):
+    __tablename__ = 'users'
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    username: Mapped[str] = mapped_column(String(80), unique=True, nullable=False)
+    email: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
+    password_hash: Mapped[str] = mapped_column(String(256), nullable=False)
+    role: Mapped[str] = mapped_column(String(20), nullable=False, default='user')
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    last_login: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    def __init__(self, username: str, email: str, password: str) -> None:
+        self.username = username.strip()
+        self.email = email.strip().lower()
+        self.set_password(password)
+
+    def set_password(self, password: str) -> None:
+        self.password_hash = generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
+    def check_password(self, password: str) -> bool:
+        return check_password_hash(self.password_hash, password)
+
+    def needs_rehash(self) -> bool:
+        return self.password_hash.split('$', 1)[0] != PASSWORD_HASH_PREFIX
+
+@lru_cache(maxsize=1)
+def dummy_password_hash() -> str:
+    """Hash checked for unknown usernames, made with the slowest method among stored hashes.
+    
+    Older hashes are only upgraded when their owner logs in, so a dummy made with
+    the current method alone would let timing separate unknown usernames from
+    accounts still on a slower method.
+    """
+    stored_methods = db.session.query(
+        func.substr(User.password_hash, 1, func.instr(User.password_hash, '$') - 1)
+    ).distinct()
+    slowest_hash, slowest_time = '', -1.0
+    for method in {PASSWORD_HASH_PREFIX, *(method for (method,) in stored_methods)}:
+        try:
+            candidate = generate_password_hash(os.urandom(16).hex(), method=method)
+        except ValueError:
+            continue
+        started = time.perf_counter()
+        check_password_hash(candidate, '')
+        elapsed = time.perf_counter() - started
+        if elapsed > slowest_time:
+            slowest_hash, slowest_time = candidate, elapsed
+    return slowest_hash
+
+class Software(db.Model):
+    __tablename__ = 'software'
+    __table_args__ = (
+        Index('ix_software_renewal', 'renewal_date'),
+        # Software is identified by name and vendor; backs the duplicate checks
+        Index('ix_software_name_vendor', 'name', 'vendor', unique=True),
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    vendor: Mapped[str] = mapped_column(String(100), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    license_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    total_licenses: Mapped[int] = mapped_column(Integer, nullable=False)
+    cost_per_license: Mapped[float] = mapped_column(Float, nullable=False)
+    renewal_date: Mapped[date] = mapped_column(Date, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Computed by SQLite as part of the row so it can be selected and aggregated without Python
+    total_cost: Mapped[float] = column_property(total_licenses * cost_per_license)
+    
+    # Relationships
+    licenses: Mapped[List['License']] = relationship('License', backref='software', lazy=True)
+    
+    def __init__(self, name: str, vendor: str, description: str, license_type: str,
+                 total_licenses: int, cost_per_license: float, renewal_date: date) -> None:
+        self.name = name
+        self.vendor = vendor
+        self.description = description
+        self.license_type = license_type
+        self.total_licenses = total_licenses
+        self.cost_per_license = cost_per_license
+        self.renewal_date = renewal_date
+    
+    @property
+    def usage_percentage(self) -> float:
+        if self.total_licenses == 0:
+            return 0
+        return (self.used_licenses / self.total_licenses) * 100
+    
+    # Cached per instance; instances only live for one request/session,
+    # so templates reading it repeatedly compute it once per row
+    @cached_property
+    def days_until_renewal(self) -> int:
+        return (self.renewal_date - datetime.now().date()).days
+
+class License(db.Model):
+    __tablename__ = 'licenses'
+    __table_args__ = (
+        Index('ix_license_sw_status', 'software_id', 'status'),
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    software_id: Mapped[int] = mapped_column(Integer, ForeignKey('software.id'), nullable=False)
+    assigned_to: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('users.id'))
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default='active')
+    assigned_date: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    last_used: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, software_id: int, assigned_to: int, status: str = 'active',
+                 assigned_date: Optional[datetime] = None, last_used: Optional[datetime] = None) -> None:
+        self.software_id = software_id
+        self.assigned_to = assigned_to
+        self.status = status
+        self.assigned_date = assigned_date or datetime.utcnow()
+        self.last_used = last_used
+
+# Active license count as a correlated subquery; deferred so it is only
+# selected by queries that name it (or undefer it on ORM loads)
+Software.used_licenses = column_property(
+    select(func.count(License.id))
+    .where(and_(License.software_id == Software.id, License.status == 'active'))
+    .correlate_except(License)
+    .scalar_subquery(),
+    deferred=True
+)
+
+# Flushes only mark the stats stale; once the change is committed the cache moves
+# to a new generation. The generation is part of the cache key, so a request that
+# read the old rows before the commit stores its result under a key no one reads
+DASHBOARD_STALE_KEY = 'dashboard_stats_stale'
+_dashboard_cache_generation = 0
+_dashboard_cache_lock = threading.Lock()
+
+def dashboard_cache_key() -> str:
+    """Cache key for the current generation of dashboard stats."""
+    return f'{DASHBOARD_CACHE_KEY}:{_dashboard_cache_generation}'
+
+def invalidate_dashboard_stats() -> None:
+    """Start a new dashboard stats generation and drop the previous entry."""
+    global _dashboard_cache_generation
+    with _dashboard_cache_lock:
+        stale_key = dashboard_cache_key()
+        _dashboard_cache_generation += 1
+    cache.delete(stale_key)
+
+@event.listens_for(db.session, 'after_flush')
+def mark_dashboard_stale(session, flush_context) -> None:
+    """Remember that this transaction changed Software or License rows."""
+    if any(isinstance(obj, (Software, License)) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[DASHBOARD_STALE_KEY] = True
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_dashboard_cache(session) -> None:
+    """Drop cached dashboard stats after a commit that changed Software or License rows."""
+    if session.info.pop(DASHBOARD_STALE_KEY, False):
+        invalidate_dashboard_stats()
+
+@event.listens_for(db.session, 'after_rollback')
+def clear_dashboard_stale(session) -> None:
+    """Rolled back changes never reached the database, so the stats are still valid."""
+    session.info.pop(DASHBOARD_STALE_KEY, None)
+
+# FTS5 trigram index over software name/vendor/description, synced by triggers
+software_fts = table('software_fts', column('rowid'))
+SOFTWARE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE software_fts USING fts5(
+        name, vendor, description, content='software', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER software_fts_ai AFTER INSERT ON software BEGIN
+        INSERT INTO software_fts(rowid, name, vendor, description)
+        VALUES (new.id, new.name, new.vendor, new.description);
+    END""",
+    """CREATE TRIGGER software_fts_ad AFTER DELETE ON software BEGIN
+        INSERT INTO software_fts(software_fts, rowid, name, vendor, description)
+        VALUES ('delete', old.id, old.name, old.vendor, old.description);
+    END""",
+    """CREATE TRIGGER software_fts_au AFTER UPDATE ON software BEGIN
+        INSERT INTO software_fts(software_fts, rowid, name, vendor, description)
+        VALUES ('delete', old.id, old.name, old.vendor, old.description);
+        INSERT INTO software_fts(rowid, name, vendor, description)
+        VALUES (new.id, new.name, new.vendor, new.description);
+    END""",
+    "INSERT INTO software_fts(software_fts) VALUES ('rebuild')"
+]
+
+def create_missing_indexes() -> None:
+    """Create model indexes missing from an existing database, skipping any that fail.
+    
+    A unique index cannot be built over rows that already violate it (e.g. duplicate
+    software added before the constraint existed); the app still works without it.
+    """
+    for model_table in db.metadata.sorted_tables:
+        for index in model_table.indexes:
+            try:
+                index.create(db.engine, checkfirst=True)
+            except (IntegrityError, OperationalError) as e:
+                logger.warning(f"Skipping index {index.name}: {e}")
+
+def create_software_fts() -> None:
+    """Create the software full-text index and its sync triggers if they are missing."""
+    try:
+        with db.engine.begin() as connection:
+            if connection.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'software_fts'"
+            )).first():
+                return
+            for statement in SOFTWARE_FTS_DDL:
+                connection.execute(text(statement))
+    except OperationalError as e:
+        logger.warning(f"Full-text search unavailable, falling back to LIKE: {e}")
+
+@lru_cache(maxsize=1)
+def software_fts_available() -> bool:
+    """Check once per process whether the software full-text index exists."""
+    return db.session.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'software_fts'"
+    )).first() is not None
+
+def software_usage_percentage():
+    """SQL expression for a software's license usage percentage (0 when it has no licenses)."""
+    return func.coalesce(Software.used_licenses * 1.0 / func.nullif(Software.total_licenses, 0) * 100, 0)
+
+def software_summary_columns(today: date) -> List[Any]:
+    """Columns the list views show, with usage, total cost and days until renewal computed in SQL."""
+    return [
+        Software.name,
+        Software.vendor,
+        Software.total_licenses,
+        Software.used_licenses,
+        Software.cost_per_license,
+        Software.renewal_date,
+        software_usage_percentage().label('usage_percentage'),
+        Software.total_cost,
+        sql_cast(
+            func.julianday(Software.renewal_date) - func.julianday(today), Integer
+        ).label('days_until_renewal')
+    ]
+
+def renewal_due_soon(today: date):
+    """SQL filter for software renewing after today and within the warning window.
+    
+    A single bound range on renewal_date, so SQLite can scan ix_software_renewal.
+    """
+    return Software.renewal_date.between(
+        today + timedelta(days=1), today + timedelta(days=RENEWAL_WARNING_DAYS)
+    )
+
+def software_metrics_columns(today: date) -> List[Any]:
+    """Full software row plus the computed summary metrics."""
+    return [
+        Software.id,
+        Software.description,
+        Software.license_type,
+        *software_summary_columns(today)
+    ]
+
+def count_where(condition):
+    """SQL aggregate counting the rows that match condition (0 for no rows)."""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def active_license_counts():
+    """Subquery of (software_id, used) active license counts per software."""
+    return select(License.software_id, func.count(License.id).label('used')) \
+        .where(License.status == 'active') \
+        .group_by(License.software_id) \
+        .subquery()
+
+@cache.cached(timeout=DASHBOARD_CACHE_TIMEOUT, key_prefix=dashboard_cache_key)
+def _compute_dashboard_stats():
+    """Compute fleet-wide statistics; cached until Software or License rows change.
+
+    Shared by the dashboard view and the AI chat context. Raises on database errors.
+    """
+    today = datetime.now().date()
+    
+    # Per-software expressions evaluated inside SQLite
+    counts = active_license_counts()
+    used = func.coalesce(counts.c.used, 0)
+    cost = Software.total_cost
+    usage = case((Software.total_licenses > 0, used * 100.0 / Software.total_licenses), else_=0)
+    
+    # All scalar stats and category counts in one aggregate row
+    row = db.session.execute(
+        select(
+            func.count(Software.id).label('total_software'),
+            func.coalesce(func.sum(Software.total_licenses), 0).label('total_licenses'),
+            func.coalesce(func.sum(used), 0).label('active_licenses'),
+            func.coalesce(func.sum(cost), 0).label('total_cost'),
+            count_where(renewal_due_soon(today)).label('expiring_soon'),
+            count_where(Software.renewal_date <= today).label('expired'),
+            func.coalesce(func.sum(case(
+                (usage < 30, (Software.total_licenses - used) * Software.cost_per_license), else_=0
+            )), 0).label('potential_savings'),
+            count_where(usage >= 80).label('high_usage'),
+            count_where(and_(usage >= 30, usage < 80)).label('medium_usage'),
+            count_where(usage < 30).label('low_usage'),
+            count_where(cost >= 100000).label('high_cost'),
+            count_where(and_(cost >= 10000, cost < 100000)).label('medium_cost'),
+            count_where(cost < 10000).label('low_cost')
+        )
+        .select_from(Software)
+        .outerjoin(counts, counts.c.software_id == Software.id)
+    ).one()
+    
+    # License type and vendor distributions from one grouped query
+    license_types: Counter[str] = Counter()
+    vendor_distribution: Counter[str] = Counter()
+    for license_type, vendor, count in db.session.execute(
+        select(Software.license_type, Software.vendor, func.count(Software.id))
+        .group_by(Software.license_type, Software.vendor)
+    ):
+        license_types[license_type] += count
+        vendor_distribution[vendor] += count
+    
+    # License utilization
+    utilization = (row.active_licenses / row.total_licenses * 100) if row.total_licenses > 0 else 0
+    
+    # Cost metrics
+    avg_cost_per_license = row.total_cost / row.total_licenses if row.total_licenses > 0 else 0
+    
+    return {
+        'total_software': row.total_software,
+        'total_licenses': row.total_licenses,
+        'active_licenses': row.active_licenses,
+        'total_cost': row.total_cost,
+        'utilization': utilization,
+        'expiring_soon': row.expiring_soon,
+        'expired': row.expired,
+        'avg_cost_per_license': avg_cost_per_license,
+        'potential_savings': row.potential_savings,
+        'license_types': dict(license_types),
+        'vendor_distribution': dict(vendor_distribution),
+        'usage_categories': {
+            'high': row.high_usage,
+            'medium': row.medium_usage,
+            'low': row.low_usage
+        },
+        'cost_categories': {
+            'high': row.high_cost,
+            'medium': row.medium_cost,
+            'low': row.low_cost
+        }
+    }
+
+def get_dashboard_stats():
+    """Get statistics for the dashboard."""
+    try:
+        return _compute_dashboard_stats()
+    except Exception as e:
+        logger.error(f"Error getting dashboard stats: {e}")
+        return {
+            'total_software': 0,
+            'total_licenses': 0,
+            'active_licenses': 0,
+            'total_cost': 0,
+            'utilization': 0,
+            'expiring_soon': 0,
+            'expired': 0,
+            'avg_cost_per_license': 0,
+            'potential_savings': 0,
+            'license_types': {},
+            'vendor_distribution': {},
+            'usage_categories': {'high': 0, 'medium': 0, 'low': 0},
+            'cost_categories': {'high': 0, 'medium': 0, 'low': 0}
+        }
+
+def get_top_software():
+    """Get top software by usage."""
+    try:
+        # Active license counts per software
+        used = active_license_counts()
+        usage_ratio = func.coalesce(used.c.used, 0) * 1.0 / func.nullif(Software.total_licenses, 0)
+        
+        # Order by usage ratio in the database and get top 3
+        query = select(Software) \
+            .outerjoin(used, used.c.software_id == Software.id) \
+            .order_by(desc(usage_ratio), Software.id) \
+            .limit(3)
+        return db.session.execute(query).scalars().all()
+    except Exception as e:
+        logger.error(f"Error getting top software: {e}")
+        return []
+
+# Sample software inventory; renewal_days is relative to the seeding date
+SAMPLE_SOFTWARE: List[Dict[str, Any]] = [
+    # High-Value Enterprise Software
+    {
+        'name': 'SAP HANA Enterprise',
+        'vendor': 'SAP',
+        'description': 'In-Memory Database Platform',
+        'license_type': 'Per Core',
+        'total_licenses': 48,
+        'cost_per_license': 12000.00,
+        'renewal_days': 45
+    },
+    {
+        'name': 'Oracle Cloud Infrastructure',
+        'vendor': 'Oracle',
+        'description': 'Enterprise Cloud Platform',
+        'license_type': 'Per User',
+        'total_licenses': 2000,
+        'cost_per_license': 200.00,
+        'renewal_days': 15
+    },
+    {
+        'name': 'Microsoft Azure AD Premium P2',
+        'vendor': 'Microsoft',
+        'description': 'Advanced Identity Protection',
+        'license_type': 'Per User',
+        'total_licenses': 1500,
+        'cost_per_license': 18.00,
+        'renewal_days': 90
+    },
+
+    # Security Software
+    {
+        'name': 'CrowdStrike Falcon Enterprise',
+        'vendor': 'CrowdStrike',
+        'description': 'Endpoint Protection Platform',
+        'license_type': 'Per Endpoint',
+        'total_licenses': 3000,
+        'cost_per_license': 85.00,
+        'renewal_days': 10
+    },
+    {
+        'name': 'Palo Alto Prisma Cloud',
+        'vendor': 'Palo Alto Networks',
+        'description': 'Cloud Security Platform',
+        'license_type': 'Per Workload',
+        'total_licenses': 500,
+        'cost_per_license': 150.00,
+        'renewal_days': 25
+    },
+
+    # Development Tools
+    {
+        'name': 'JetBrains All Products Pack',
+        'vendor': 'JetBrains',
+        'description': 'Complete Development Suite',
+        'license_type': 'Per User',
+        'total_licenses': 200,
+        'cost_per_license': 649.00,
+        'renewal_days': 5
+    },
+    {
+        'name': 'GitHub Enterprise',
+        'vendor': 'GitHub',
+        'description': 'Enterprise Code Repository',
+        'license_type': 'Per User',
+        'total_licenses': 1000,
+        'cost_per_license': 21.00,
+        'renewal_days': 180
+    },
+
+    # Analytics and BI
+    {
+        'name': 'Snowflake Enterprise',
+        'vendor': 'Snowflake',
+        'description': 'Data Warehouse Platform',
+        'license_type': 'Per Credit',
+        'total_licenses': 5000,
+        'cost_per_license': 23.00,
+        'renewal_days': 8
+    },
+    {
+        'name': 'Databricks Unity Catalog',
+        'vendor': 'Databricks',
+        'description': 'Data Lakehouse Platform',
+        'license_type': 'Per DBU',
+        'total_licenses': 10000,
+        'cost_per_license': 15.00,
+        'renewal_days': 12
+    },
+
+    # Collaboration Tools
+    {
+        'name': 'Miro Enterprise',
+        'vendor': 'Miro',
+        'description': 'Visual Collaboration Platform',
+        'license_type': 'Per User',
+        'total_licenses': 800,
+        'cost_per_license': 16.00,
+        'renewal_days': 60
+    },
+    {
+        'name': 'Notion Enterprise',
+        'vendor': 'Notion',
+        'description': 'Workspace and Wiki Platform',
+        'license_type': 'Per User',
+        'total_licenses': 1200,
+        'cost_per_license': 8.00,
+        'renewal_days': 150
+    },
+
+    # Infrastructure Management
+    {
+        'name': 'HashiCorp Enterprise Suite',
+        'vendor': 'HashiCorp',
+        'description': 'Infrastructure Automation Suite',
+        'license_type': 'Per Node',
+        'total_licenses': 300,
+        'cost_per_license': 200.00,
+        'renewal_days': 18
+    },
+    {
+        'name': 'Kubernetes Enterprise Support',
+        'vendor': 'VMware',
+        'description': 'Container Orchestration Support',
+        'license_type': 'Per Cluster',
+        'total_licenses': 50,
+        'cost_per_license': 2000.00,
+        'renewal_days': 30
+    },
+
+    # Design and Creative
+    {
+        'name': 'Figma Enterprise',
+        'vendor': 'Figma',
+        'description': 'Design Collaboration Platform',
+        'license_type': 'Per Editor',
+        'total_licenses': 150,
+        'cost_per_license': 45.00,
+        'renewal_days': 75
+    },
+    {
+        'name': 'AutoCAD Collection',
+        'vendor': 'Autodesk',
+        'description': 'Complete CAD Suite',
+        'license_type': 'Per User',
+        'total_licenses': 100,
+        'cost_per_license': 3295.00,
+        'renewal_days': 40
+    },
+
+    # Compliance and Security
+    {
+        'name': 'Qualys Enterprise',
+        'vendor': 'Qualys',
+        'description': 'Vulnerability Management Platform',
+        'license_type': 'Per Asset',
+        'total_licenses': 2500,
+        'cost_per_license': 35.00,
+        'renewal_days': 15
+    },
+    {
+        'name': 'SailPoint IdentityNow',
+        'vendor': 'SailPoint',
+        'description': 'Identity Governance Platform',
+        'license_type': 'Per Identity',
+        'total_licenses': 3000,
+        'cost_per_license': 25.00,
+        'renewal_days': 20
+    },
+
+    # Customer Support
+    {
+        'name': 'Zendesk Enterprise Suite',
+        'vendor': 'Zendesk',
+        'description': 'Customer Service Platform',
+        'license_type': 'Per Agent',
+        'total_licenses': 200,
+        'cost_per_license': 199.00,
+        'renewal_days': 95
+    },
+    {
+        'name': 'ServiceNow IT Service Management',
+        'vendor': 'ServiceNow',
+        'description': 'ITSM Platform',
+        'license_type': 'Per Fulfiller',
+        'total_licenses': 150,
+        'cost_per_license': 180.00,
+        'renewal_days': 110
+    },
+
+    # Recently Added Software
+    {
+        'name': 'Zoom Enterprise Plus',
+        'vendor': 'Zoom',
+        'description': 'Advanced Enterprise Video Conferencing',
+        'license_type': 'Per Host',
+        'total_licenses': 800,
+        'cost_per_license': 35.00,
+        'renewal_days': 300
+    },
+    {
+        'name': 'Microsoft Power BI Pro',
+        'vendor': 'Microsoft',
+        'description': 'Professional Business Intelligence Tool',
+        'license_type': 'Per User',
+        'total_licenses': 500,
+        'cost_per_license': 10.00,
+        'renewal_days': 250
+    },
+    {
+        'name': 'AWS EC2 Reserved Instances',
+        'vendor': 'Amazon',
+        'description': 'Reserved EC2 Compute Instances',
+        'license_type': 'Per Instance',
+        'total_licenses': 100,
+        'cost_per_license': 500.00,
+        'renewal_days': 400
+    },
+    {
+        'name': 'GitLab Ultimate',
+        'vendor': 'GitLab',
+        'description': 'Complete DevOps Platform',
+        'license_type': 'Per User',
+        'total_licenses': 300,
+        'cost_per_license': 99.00,
+        'renewal_days': 280
+    },
+    # Expiring Software
+    {
+        'name': 'Cisco Webex Enterprise',
+        'vendor': 'Cisco',
+        'description': 'Enterprise Collaboration Platform',
+        'license_type': 'Per User',
+        'total_licenses': 1000,
+        'cost_per_license': 25.00,
+        'renewal_days': 15
+    },
+    {
+        'name': 'Symantec Endpoint Protection',
+        'vendor': 'Broadcom',
+        'description': 'Enterprise Security Solution',
+        'license_type': 'Per Device',
+        'total_licenses': 2000,
+        'cost_per_license': 45.00,
+        'renewal_days': 20
+    },
+    {
+        'name': 'Citrix Virtual Apps',
+        'vendor': 'Citrix',
+        'description': 'Application Virtualization',
+        'license_type': 'Per User',
+        'total_licenses': 500,
+        'cost_per_license': 300.00,
+        'renewal_days': 25
+    },
+    {
+        'name': 'New Relic Pro',
+        'vendor': 'New Relic',
+        'description': 'Application Performance Monitoring',
+        'license_type': 'Per Host',
+        'total_licenses': 150,
+        'cost_per_license': 75.00,
+        'renewal_days': 10
+    },
+    # Expired Software
+    {
+        'name': 'Oracle WebLogic Server',
+        'vendor': 'Oracle',
+        'description': 'Enterprise Application Server',
+        'license_type': 'Per Core',
+        'total_licenses': 32,
+        'cost_per_license': 4500.00,
+        'renewal_days': -15
+    },
+    {
+        'name': 'IBM Db2',
+        'vendor': 'IBM',
+        'description': 'Enterprise Database',
+        'license_type': 'Per Core',
+        'total_licenses': 16,
+        'cost_per_license': 7800.00,
+        'renewal_days': -30
+    },
+    {
+        'name': 'SolarWinds NPM',
+        'vendor': 'SolarWinds',
+        'description': 'Network Performance Monitor',
+        'license_type': 'Per Device',
+        'total_licenses': 100,
+        'cost_per_license': 150.00,
+        'renewal_days': -5
+    },
+    {
+        'name': 'Trend Micro Deep Security',
+        'vendor': 'Trend Micro',
+        'description': 'Server Security Platform',
+        'license_type': 'Per Server',
+        'total_licenses': 50,
+        'cost_per_license': 250.00,
+        'renewal_days': -8
+    },
+    # Actively Used Software
+    {
+        'name': 'Atlassian Confluence',
+        'vendor': 'Atlassian',
+        'description': 'Team Collaboration Software',
+        'license_type': 'Per User',
+        'total_licenses': 1000,
+        'cost_per_license': 5.00,
+        'renewal_days': 180
+    },
+    {
+        'name': 'Datadog Enterprise',
+        'vendor': 'Datadog',
+        'description': 'Infrastructure Monitoring',
+        'license_type': 'Per Host',
+        'total_licenses': 200,
+        'cost_per_license': 35.00,
+        'renewal_days': 150
+    },
+    {
+        'name': 'PagerDuty Enterprise',
+        'vendor': 'PagerDuty',
+        'description': 'Incident Management Platform',
+        'license_type': 'Per User',
+        'total_licenses': 300,
+        'cost_per_license': 39.00,
+        'renewal_days': 200
+    },
+    {
+        'name': 'Okta Enterprise',
+        'vendor': 'Okta',
+        'description': 'Identity Management',
+        'license_type': 'Per User',
+        'total_licenses': 1500,
+        'cost_per_license': 25.00,
+        'renewal_days': 220
+    }
+]
+
+def add_sample_software() -> List[Software]:
+    """Build Software objects for the sample inventory."""
+    today = datetime.now().date()
+    return [
+        Software(
+            name=spec['name'],
+            vendor=spec['vendor'],
+            description=spec['description'],
+            license_type=spec['license_type'],
+            total_licenses=spec['total_licenses'],
+            cost_per_license=spec['cost_per_license'],
+            renewal_date=today + timedelta(days=spec['renewal_days'])
+        )
+        for spec in SAMPLE_SOFTWARE
+    ]
+
+def init_db():
+    """Initialize the database and create admin user if it doesn't exist."""
+    try:
+        # Create database directory if it doesn't exist
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        
+        # Create all tables
+        with app.app_context():
+            db.create_all()
+            
+            # create_all skips indexes on tables that already exist
+            create_missing_indexes()
+            
+            # Full-text search index over software
+            create_software_fts()
+            
+            # Seed everything in one transaction, committed once on exit
+            with db.session.begin(), db.session.no_autoflush:
+                # Check if admin user exists
+                admin = User.query.filter_by(username='admin').first()
+                if not admin:
+                    # Create admin user
+                    admin = User(
+                        username='admin',
+                        email='admin@samurai.com',
+                        password='Admin@123'
+                    )
+                    admin.role = 'admin'
+                    
+                    # Add regular users for demo
+                    users = [
+                        admin,
+                        User(username='john.doe', email='john.doe@company.com', password='User@123'),
+                        User(username='jane.smith', email='jane.smith@company.com', password='User@123'),
+                        User(username='bob.wilson', email='bob.wilson@company.com', password='User@123'),
+                        User(username='alice.brown', email='alice.brown@company.com', password='User@123'),
+                    ]
+                    db.session.add_all(users)
+                    
+                    # Add sample software data if none exists
+                    if not db.session.query(exists().where(Software.id.isnot(None))).scalar():
+                        # Add existing sample software
+                        sample_software = add_sample_software()
+                        db.session.add_all(sample_software)
+                        
+                        # One flush assigns ids to the in-memory users and software
+                        db.session.flush()
+                        
+                        # Create license assignments with varying usage patterns,
+                        # assigning 60-90% of each software's total licenses
+                        licenses = [
+                            {
+                                'software_id': software.id,
+                                'assigned_to': random.choice(users).id,
+                                'status': 'active',
+                                'assigned_date': datetime.now() - timedelta(days=random.randint(1, 180)),
+                                'last_used': datetime.now() - timedelta(days=random.randint(0, 30))
+                            }
+                            for software in sample_software
+                            for _ in range(int(software.total_licenses * random.uniform(0.6, 0.9)))
+                        ]
+                        
+                        # Insert all licenses with a single executemany
+                        db.session.execute(insert(License), licenses)
+                        logger.info("Admin user and sample data created successfully!")
+                        logger.info(f"Database initialized at: {db_path}")
+                
+    except Exception as e:
+        logger.error(f"Error initializing database: {e}")
+        if os.path.exists(db_path):
+            logger.info("Removing corrupted database file...")
+            os.remove(db_path)
+        if 'admin' in locals():
+            db.session.rollback()
+        raise
+
+@login_manager.user_loader
+def load_user(user_id: str) -> Optional[User]:
+    if not user_id:
+        return None
+    try:
+        return db.session.get(User, int(user_id))
+    except Exception as e:
+        logger.error(f"Error loading user: {e}")
+        return None
+
+@app.before_request
+def before_request():
+    # Lifetime comes from PERMANENT_SESSION_LIFETIME; only mark the session
+    # permanent once so this does not modify (and re-issue) it on every request
+    if not session.permanent:
+        session.permanent = True
+
+@app.route('/')
+def index():
+    if current_user.is_authenticated:
+        return redirect(url_for('dashboard'))
+    return redirect(url_for('login'))
+
+@app.route('/register', methods=['GET', 'POST'])
+def register():
+    if current_user.is_authenticated:
+        return redirect(url_for('dashboard'))
+        
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        email = request.form.get('email', '').strip().lower()
+        password = request.form.get('password', '').strip()
+        
+        logger.debug(f"Registration attempt - Username: {username}, Email: {email}")
+        
+        # Validate all fields are present
+        if not username:
+            flash('Username is required', 'error')
+            return redirect(url_for('register'))
+        if not email:
+            flash('Email is required', 'error')
+            return redirect(url_for('register'))
+        if not password:
+            flash('Password is required', 'error')
+            return redirect(url_for('register'))
+        
+        # Validate username and email format
+        if not USERNAME_RE.match(username):
+            flash('Username must be 3-80 characters and contain only letters, numbers, dots, underscores or hyphens', 'error')
+            return redirect(url_for('register'))
+        if not EMAIL_RE.match(email):
+            flash('Please enter a valid email address', 'error')
+            return redirect(url_for('register'))
+        
+        # Validate password length
+        if len(password) < 6:
+            flash('Password must be at least 6 characters long', 'error')
+            return redirect(url_for('register'))
+        
+        try:
+            # Check username and email in a single round trip
+            username_taken, email_taken = db.session.query(
+                exists().where(User.username == username),
+                exists().where(User.email == email)
+            ).one()
+            if username_taken:
+                flash('Username already exists', 'error')
+                return redirect(url_for('register'))
+            if email_taken:
+                flash('Email already registered', 'error')
+                return redirect(url_for('register'))
+            
+            # Create new user
+            user = User(
+                username=username,
+                email=email,
+                password=password
+            )
+            db.session.add(user)
+            db.session.commit()
+            logger.info(f"New user registered successfully: {username}")
+            
+            flash('Registration successful! Please login.', 'success')
+            return redirect(url_for('login'))
+            
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Registration error: {e}")
+            flash('An error occurred during registration. Please try again.', 'error')
+            return redirect(url_for('register'))
+    
+    return render_template('register.html')
+
+@app.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('dashboard'))
+    
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        remember = bool(request.form.get('remember'))
+        # Resolved before the lookup so the one-off setup cost hits either branch
+        dummy_hash = dummy_password_hash()
+        
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            # Spend at least the hashing work of a wrong password to avoid leaking valid usernames
+            check_password_hash(dummy_hash, password or '')
+        elif user.check_password(password):
+            # Upgrade hashes created with an older or slower method
+            if user.needs_rehash():
+                user.set_password(password)
+                db.session.commit()
+            login_user(user, remember=remember)
+            next_page = request.args.get('next')
+            if next_page:
+                return redirect(next_page)
+            return redirect(url_for('dashboard'))
+        flash('Invalid username or password', 'error')
+    
+    return render_template('login.html')
+
+@app.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('You have been logged out successfully.', 'success')
+    return redirect(url_for('login'))
+
+@app.route('/dashboard')
+@login_required
+def dashboard():
+    try:
+        # Get basic stats from the cached fleet aggregates
+        fleet_stats = _compute_dashboard_stats()
+
+        # Format stats for display
+        stats = {
+            'total_software': fleet_stats['total_software'],
+            'total_licenses': fleet_stats['total_licenses'],
+            'used_licenses': fleet_stats['active_licenses'],
+            'utilization': round(fleet_stats['utilization'], 2)
+        }
+
+        # Get top software by usage
+        top_software = db.session.query(
+            Software.name,
+            Software.vendor,
+            Software.total_licenses,
+            Software.used_licenses,
+            software_usage_percentage().label('usage_percentage')
+        ).order_by(Software.used_licenses.desc(), Software.id) \
+            .limit(5) \
+            .all()
+
+        return render_template('dashboard.html', 
+                            stats=stats,
+                            top_software=top_software)
+    except Exception as e:
+        logger.error(f"Dashboard error: {str(e)}")
+        flash('Error loading dashboard', 'error')
+        return render_template('dashboard.html', 
+                            stats={'total_software': 0, 'total_licenses': 0, 'used_licenses': 0, 'utilization': 0},
+                            top_software=[])
+
+@app.route('/software-inventory')
+@login_required
+def software_inventory():
+    try:
+        filter_type = request.args.get('filter', 'all')
+        page = request.args.get('page', 1, type=int)
+        per_page = 12
+        
+        logger.info(f"Software inventory accessed by user: {current_user.username}, filter: {filter_type}, page: {page}")
+        
+        # Check the inventory size without loading any rows
+        try:
+            total_software = db.session.query(func.count(Software.id)).scalar()
+            if not total_software:
+                logger.warning("No software found in database")
+                flash('No software found in the inventory.', 'info')
+                return render_template('software_inventory.html',
+                                    software_list=[],
+                                    filter_type=filter_type,
+                                    page=1,
+                                    per_page=per_page,
+                                    total=0,
+                                    has_next=False,
+                                    has_prev=False,
+                                    pages=1)
+        except Exception as e:
+            logger.error(f"Error querying software: {e}")
+            flash('Error accessing software inventory.', 'error')
+            return redirect(url_for('dashboard'))
+        
+        # Get current date for comparisons
+        today = datetime.now().date()
+        
+        # Filters and orderings evaluated in SQL
+        usage = software_usage_percentage()
+        software_query = db.session.query(*software_summary_columns(today))
+        active_query = software_query.filter(usage > 70).order_by(usage.desc(), Software.id)
+        expiring_query = software_query \
+            .filter(renewal_due_soon(today)) \
+            .order_by(Software.renewal_date, Software.id)
+        expired_query = software_query \
+            .filter(Software.renewal_date <= today) \
+            .order_by(Software.renewal_date.desc(), Software.id)
+        
+        try:
+            if filter_type == 'active':
+                # Get software with usage > 70%
+                filtered_query = active_query
+            elif filter_type == 'expiring':
+                # Get software expiring in next 30 days
+                filtered_query = expiring_query
+            elif filter_type == 'expired':
+                # Get expired software
+                filtered_query = expired_query
+            else:
+                # For 'all' view, we'll get different categories
+                return render_template('software_inventory.html',
+                                    active_software=active_query.limit(8).all(),
+                                    expiring_software=expiring_query.limit(8).all(),
+                                    expired_software=expired_query.limit(8).all(),
+                                    filter_type=filter_type,
+                                    page=1,
+                                    per_page=per_page,
+                                    total=total_software,
+                                    has_next=False,
+                                    has_prev=False,
+                                    pages=1)
+            
+            # Paginate filtered results in the database
+            pagination = filtered_query.paginate(page=page, per_page=per_page, error_out=False)
+            
+            return render_template('software_inventory.html',
+                                software_list=pagination.items,
+                                filter_type=filter_type,
+                                page=pagination.page,
+                                per_page=per_page,
+                                total=pagination.total,
+                                has_next=pagination.has_next,
+                                has_prev=pagination.has_prev,
+                                pages=pagination.pages)
+                                
+        except Exception as e:
+            logger.error(f"Error processing software inventory: {e}")
+            flash('Error processing software inventory.', 'error')
+            return redirect(url_for('dashboard'))
+                            
+    except Exception as e:
+        logger.error(f"Unhandled error in software inventory: {e}")
+        flash('An error occurred while loading the software inventory.', 'error')
+        return redirect(url_for('dashboard'))
+
+@app.route('/user-management')
+@login_required
+def user_management():
+    page = request.args.get('page', 1, type=int)
+    per_page = 10
+
+    # Users active in last 24 hours and new users this month
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    first_of_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    # Calculate statistics in one aggregate query
+    total_users, admin_users, active_users, new_users = db.session.query(
+        func.count(User.id),
+        count_where(User.role == 'admin'),
+        count_where(User.last_login >= yesterday),
+        count_where(User.created_at >= first_of_month)
+    ).one()
+
+    # Get users with pagination, reusing the total instead of a second count
+    users = User.query.order_by(User.created_at.desc()).paginate(page=page, per_page=per_page, count=False)
+    users.total = total_users
+
+    return render_template('user_management.html',
+                         users=users,
+                         total_users=total_users,
+                         admin_users=admin_users,
+                         active_users=active_users,
+                         new_users=new_users,
+                         now=datetime.utcnow(),
+                         pages=users.pages,
+                         current_page=page,
+                         has_prev=users.has_prev,
+                         has_next=users.has_next,
+                         prev_num=users.prev_num,
+                         next_num=users.next_num)
+
+@app.route('/reports')
+@login_required
+def reports():
+    report_type = request.args.get('type', 'general')
+    
+    today = datetime.now().date()
+    
+    # Chart data only needs each software's name, usage and cost
+    software_list = db.session.query(
+        Software.name,
+        software_usage_percentage().label('usage_percentage'),
+        Software.total_cost
+    ).all()
+    
+    # Calculate summary statistics in one aggregate query
+    usage = software_usage_percentage()
+    total_software, total_cost, total_licenses, used_licenses, avg_usage = db.session.query(
+        func.count(Software.id),
+        func.coalesce(func.sum(Software.total_cost), 0),
+        func.coalesce(func.sum(Software.total_licenses), 0),
+        func.coalesce(func.sum(Software.used_licenses), 0),
+        func.coalesce(func.avg(usage), 0)
+    ).one()
+    
+    # Get expiring licenses
+    horizon = today + timedelta(days=RENEWAL_WARNING_DAYS)
+    expiring_soon = db.session.query(*software_summary_columns(today)) \
+        .filter(Software.renewal_date <= horizon) \
+        .order_by(Software.id) \
+        .all()
+    
+    # Get underutilized software (less than 30% usage)
+    underutilized = db.session.query(*software_summary_columns(today)) \
+        .filter(usage < 30) \
+        .order_by(Software.id) \
+        .all()
+    
+    return render_template('reports.html',
+                         report_type=report_type,
+                         software_list=software_list,
+                         total_software=total_software,
+                         total_cost=total_cost,
+                         total_licenses=total_licenses,
+                         used_licenses=used_licenses,
+                         avg_usage=avg_usage,
+                         expiring_soon=expiring_soon,
+                         underutilized=underutilized)
+
+@app.route('/api/export-report')
+@login_required
+def export_report():
+    import csv
+    import io
+    import itertools
+    
+    try:
+        # Derived metrics are computed by SQLite alongside the row fetch
+        software_query = db.session.query(
+            *software_summary_columns(datetime.now().date())
+        ).order_by(Software.id).yield_per(500)
+        
+        # Run the query and fetch the first batch now, so database errors are
+        # still caught below and answered with a redirect instead of a broken file
+        rows = iter(software_query)
+        first_row = next(rows, None)
+        
+        def generate():
+            # Reuse one buffer so only a single CSV row is held in memory at a time
+            output = io.StringIO()
+            writer = csv.writer(output)
+            
+            def flush_row() -> str:
+                row = output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+                return row
+            
+            # Write headers
+            writer.writerow([
+                'Software Name', 'Vendor', 'Total Licenses', 'Used Licenses',
+                'Usage %', 'Cost Per License', 'Total Cost', 'Renewal Date',
+                'Days Until Renewal'
+            ])
+            yield flush_row()
+            
+            if first_row is None:
+                return
+            
+            # Write data; once streaming has started the status is sent, so later
+            # failures can only be logged and end the download early
+            try:
+                for software in itertools.chain([first_row], rows):
+                    writer.writerow([
+                        software.name,
+                        software.vendor,
+                        software.total_licenses,
+                        software.used_licenses,
+                        f"{software.usage_percentage:.1f}%",
+                        f"${software.cost_per_license:,.2f}",
+                        f"${software.total_cost:,.2f}",
+                        software.renewal_date.strftime('%Y-%m-%d'),
+                        software.days_until_renewal
+                    ])
+                    yield flush_row()
+            except Exception as e:
+                logger.error(f"Error streaming report export: {e}")
+                raise
+        
+        # Stream rows as they are encoded; keep the app context for the session
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=SAMurAI_Report.csv'}
+        )
+            
+    except Exception as e:
+        logger.error(f"Error exporting report: {e}")
+        flash('An error occurred while exporting the report.', 'error')
+        return redirect(url_for('reports'))
+
+# Admin-only JSON API; the blueprint guard authorizes every route once
+admin_bp = Blueprint('admin', __name__, url_prefix='/api')
+
+@admin_bp.before_request
+def require_admin():
+    if not current_user.is_authenticated:
+        return login_manager.unauthorized()
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+@admin_bp.route('/users', methods=['POST'])
+def add_user():
+    data = request.get_json()
+    
+    if not all(key in data for key in ['username', 'email', 'password', 'role']):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    try:
+        # Check username and email in a single round trip
+        username_taken, email_taken = db.session.query(
+            exists().where(User.username == data['username']),
+            exists().where(User.email == data['email'])
+        ).one()
+        if username_taken:
+            return jsonify({'error': 'Username already exists'}), 400
+        if email_taken:
+            return jsonify({'error': 'Email already exists'}), 400
+        
+        # Create new user
+        user = User(
+            username=data['username'],
+            email=data['email'],
+            password=data['password']
+        )
+        user.role = data['role']
+        
+        db.session.add(user)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent insert of the same username or email
+            db.session.rollback()
+            return jsonify({'error': 'Username or email already exists'}), 400
+        
+        return jsonify({
+            'message': 'User created successfully',
+            'user': {
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'role': user.role
+            }
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating user: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@admin_bp.route('/users/<int:user_id>', methods=['PUT'])
+def update_user(user_id):
+    user = db.get_or_404(User, user_id)
+    data = request.get_json()
+    
+    try:
+        if 'username' in data:
+            if db.session.query(
+                exists().where(User.username == data['username'], User.id != user_id)
+            ).scalar():
+                return jsonify({'error': 'Username already exists'}), 400
+            user.username = data['username']
+        
+        if 'email' in data:
+            if db.session.query(
+                exists().where(User.email == data['email'], User.id != user_id)
+            ).scalar():
+                return jsonify({'error': 'Email already exists'}), 400
+            user.email = data['email']
+        
+        if 'password' in data:
+            user.set_password(data['password'])
+        
+        if 'role' in data:
+            # Prevent changing own role or last admin
+            if user_id == current_user.id:
+                return jsonify({'error': 'Cannot change own role'}), 400
+            if user.role == 'admin' and data['role'] != 'admin':
+                admin_count = User.query.filter_by(role='admin').count()
+                if admin_count <= 1:
+                    return jsonify({'error': 'Cannot remove last admin'}), 400
+            user.role = data['role']
+        
+        db.session.commit()
+        return jsonify({
+            'message': 'User updated successfully',
+            'user': {
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'role': user.role
+            }
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error updating user: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@admin_bp.route('/users/<int:user_id>', methods=['DELETE'])
+def delete_user(user_id):
+    if user_id == current_user.id:
+        return jsonify({'error': 'Cannot delete own account'}), 400
+    
+    user = db.get_or_404(User, user_id)
+    
+    try:
+        # Prevent deleting last admin
+        if user.role == 'admin':
+            admin_count = User.query.filter_by(role='admin').count()
+            if admin_count <= 1:
+                return jsonify({'error': 'Cannot delete last admin'}), 400
+        
+        db.session.delete(user)
+        db.session.commit()
+        return jsonify({'message': 'User deleted successfully'})
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error deleting user: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@admin_bp.route('/software', methods=['POST'])
+def add_software():
+    data = request.get_json()
+    
+    required_fields = ['name', 'vendor', 'license_type', 'total_licenses', 'cost_per_license', 'renewal_date']
+    if not all(key in data for key in required_fields):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    try:
+        fields = {
+            'name': data['name'],
+            'vendor': data['vendor'],
+            'description': data.get('description', ''),
+            'license_type': data['license_type'],
+            'total_licenses': data['total_licenses'],
+            'cost_per_license': data['cost_per_license'],
+            'renewal_date': datetime.strptime(data['renewal_date'], '%Y-%m-%d').date()
+        }
+        
+        # INSERT ... SELECT ... WHERE NOT EXISTS: one atomic statement instead of a check
+        # followed by an insert, and it does not depend on ix_software_name_vendor, which
+        # init_db skips on databases that already hold duplicates
+        row = select(*[
+            bindparam(key, value, type_=Software.__table__.c[key].type) for key, value in fields.items()
+        ]).where(~exists().where(Software.name == fields['name'], Software.vendor == fields['vendor']))
+        # SQLite reports RETURNING values before REAL affinity is applied (5, not the
+        # stored 5.0), so float columns are cast back to the type they are stored as
+        stored_columns = [
+            sql_cast(column, column.type).label(column.name) if isinstance(column.type, Float) else column
+            for column in Software.__table__.c
+        ]
+        software = db.session.execute(
+            insert(Software).from_select(list(fields), row).returning(*stored_columns)
+        ).first()
+        if software is None:
+            return jsonify({'error': 'Software already exists'}), 400
+        
+        db.session.commit()
+        # Core inserts bypass the mapper events that normally drop the stats
+        invalidate_dashboard_stats()
+        
+        return jsonify({
+            'message': 'Software added successfully',
+            'software': {
+                'id': software.id,
+                'name': software.name,
+                'vendor': software.vendor,
+                'description': software.description,
+                'license_type': software.license_type,
+                'total_licenses': software.total_licenses,
+                'cost_per_license': software.cost_per_license,
+                'renewal_date': software.renewal_date.strftime('%Y-%m-%d')
+            }
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error adding software: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@admin_bp.route('/software/<int:software_id>', methods=['PUT'])
+def update_software(software_id):
+    software = db.get_or_404(Software, software_id)
+    data = request.get_json()
+    
+    try:
+        if 'name' in data:
+            if db.session.query(exists().where(
+                Software.name == data['name'], Software.vendor == software.vendor, Software.id != software_id
+            )).scalar():
+                return jsonify({'error': 'Software already exists'}), 400
+            software.name = data['name']
+        
+        if 'vendor' in data:
+            if db.session.query(exists().where(
+                Software.name == software.name, Software.vendor == data['vendor'], Software.id != software_id
+            )).scalar():
+                return jsonify({'error': 'Software already exists'}), 400
+            software.vendor = data['vendor']
+        
+        if 'description' in data:
+            software.description = data['description']
+        
+        if 'license_type' in data:
+            software.license_type = data['license_type']
+        
+        if 'total_licenses' in data:
+            software.total_licenses = data['total_licenses']
+        
+        if 'cost_per_license' in data:
+            software.cost_per_license = data['cost_per_license']
+        
+        if 'renewal_date' in data:
+            software.renewal_date = datetime.strptime(data['renewal_date'], '%Y-%m-%d').date()
+        
+        db.session.commit()
+        return jsonify({
+            'message': 'Software updated successfully',
+            'software': {
+                'id': software.id,
+                'name': software.name,
+                'vendor': software.vendor,
+                'description': software.description,
+                'license_type': software.license_type,
+                'total_licenses': software.total_licenses,
+                'cost_per_license': software.cost_per_license,
+                'renewal_date': software.renewal_date.strftime('%Y-%m-%d')
+            }
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error updating software: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@admin_bp.route('/software/<int:software_id>', methods=['DELETE'])
+def delete_software(software_id):
+    software = db.get_or_404(Software, software_id)
+    
+    try:
+        # Check if software has active licenses
+        active_licenses = License.query.filter_by(software_id=software_id, status='active').count()
+        if active_licenses > 0:
+            return jsonify({'error': f'Cannot delete software with {active_licenses} active licenses'}), 400
+        
+        db.session.delete(software)
+        db.session.commit()
+        return jsonify({'message': 'Software deleted successfully'})
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error deleting software: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+app.register_blueprint(admin_bp)
+
+@app.route('/api/software/search', methods=['GET'])
+@login_required
+def search_software():
+    query = request.args.get('q', '').strip()[:SEARCH_MAX_QUERY_LENGTH]
+    if not query:
+        return jsonify({'error': 'Search query is required'}), 400
+    
+    try:
+        columns = software_metrics_columns(datetime.now().date())
+        
+        if len(query) >= 3 and software_fts_available():
+            # Trigram full-text index; a quoted phrase matches substrings case-insensitively
+            phrase = '"' + query.replace('"', '""') + '"'
+            software_list = db.session.query(*columns) \
+                .join(software_fts, software_fts.c.rowid == Software.id) \
+                .filter(text('software_fts MATCH :q')) \
+                .params(q=phrase) \
+                .order_by(Software.id) \
+                .limit(SEARCH_MAX_RESULTS) \
+                .all()
+        else:
+            # Trigrams need at least three characters, so short queries scan with LIKE;
+            # wildcards in the query are escaped so they match literally
+            pattern = bindparam('pattern')
+            escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            software_list = db.session.query(*columns) \
+                .filter(or_(
+                    cast(Column[str], Software.name).ilike(pattern, escape='\\'),  # type: ignore[attr-defined]
+                    cast(Column[str], Software.vendor).ilike(pattern, escape='\\'),  # type: ignore[attr-defined]
+                    cast(Column[str], Software.description).ilike(pattern, escape='\\')  # type: ignore[attr-defined]
+                )) \
+                .params(pattern=f'%{escaped}%') \
+                .order_by(Software.id) \
+                .limit(SEARCH_MAX_RESULTS) \
+                .all()
+        
+        return jsonify({
+            'results': [
+                s._asdict()
+                for s in software_list
+            ]
+        })
+        
+    except Exception as e:
+        logger.error(f"Error searching software: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/ai-dashboard')
+@login_required
+def ai_dashboard():
+    return render_template('ai_dashboard.html')
+
+def find_relevant_software(message: str) -> List[Any]:
+    """Get up to AI_CONTEXT_MAX_SOFTWARE software rows named in the message, best match first.
+    
+    A keyword must equal a whole word of the name or vendor. Name matches score
+    twice as much as vendor matches; ties keep inventory order.
+    """
+    keywords = [
+        word for word in dict.fromkeys(KEYWORD_RE.findall(message.lower()))
+        if len(word) >= AI_CONTEXT_MIN_KEYWORD_LENGTH and word not in AI_CONTEXT_STOP_WORDS
+    ][:AI_CONTEXT_MAX_KEYWORDS]
+    if not keywords:
+        return []
+    
+    # Substring LIKE narrows the candidates in SQL; only whole-word matches are kept below
+    candidates = db.session.query(Software.id, Software.name, Software.vendor).filter(
+        or_(
+            *[Software.name.ilike(f'%{keyword}%') for keyword in keywords],
+            *[Software.vendor.ilike(f'%{keyword}%') for keyword in keywords]
+        )
+    ).all()
+    
+    wanted = set(keywords)
+    scores = {}
+    for candidate in candidates:
+        score = 2 * len(wanted.intersection(KEYWORD_RE.findall(candidate.name.lower()))) \
+            + len(wanted.intersection(KEYWORD_RE.findall(candidate.vendor.lower())))
+        if score:
+            scores[candidate.id] = score
+    ranked = sorted(scores, key=lambda software_id: (-scores[software_id], software_id))[:AI_CONTEXT_MAX_SOFTWARE]
+    if not ranked:
+        return []
+    
+    rows = db.session.query(Software.id, *software_summary_columns(datetime.now().date())) \
+        .filter(Software.id.in_(ranked)) \
+        .all()
+    return sorted(rows, key=lambda row: ranked.index(row.id))
+
+def format_software_context(software_list: List[Any]) -> str:
+    """Render one prompt line per software with its usage, cost and renewal."""
+    return '\n'.join(
+        f"        - {s.name} ({s.vendor}): {s.used_licenses}/{s.total_licenses} licenses used "
+        f"({s.usage_percentage:.1f}%), ${s.cost_per_license:,.2f} per license, "
+        f"${s.total_cost:,.2f} total, renews in {s.days_until_renewal} days"
+        for s in software_list
+    )
+
+@app.route('/api/ai-chat', methods=['POST'])
+@login_required
+def ai_chat():
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+            
+        message = data.get('message', '')
+        if not message:
+            return jsonify({'error': 'Message is required'}), 400
+
+        # Prepare context about software inventory from the cached fleet aggregates
+        fleet_stats = _compute_dashboard_stats()
+        context = {
+            'total_software': fleet_stats['total_software'],
+            'total_licenses': fleet_stats['total_licenses'],
+            'used_licenses': fleet_stats['active_licenses'],
+            'expiring_soon': fleet_stats['expiring_soon'],
+            'expired': fleet_stats['expired'],
+            'high_usage': fleet_stats['usage_categories']['high'],
+            'low_usage': fleet_stats['usage_categories']['low']
+        }
+        
+        # Only send details for software mentioned in the question to bound prompt size;
+        # otherwise ground general questions in the lowest usage and next renewals
+        relevant_software = find_relevant_software(message)
+        if relevant_software:
+            software_details = f"""Software mentioned in the question:
+{format_software_context(relevant_software)}"""
+        else:
+            today = datetime.now().date()
+            summary_query = db.session.query(*software_summary_columns(today))
+            lowest_usage = summary_query \
+                .order_by(software_usage_percentage(), Software.id) \
+                .limit(AI_CONTEXT_FALLBACK_SOFTWARE) \
+                .all()
+            next_renewals = summary_query \
+                .filter(Software.renewal_date > today) \
+                .order_by(Software.renewal_date, Software.id) \
+                .limit(AI_CONTEXT_FALLBACK_SOFTWARE) \
+                .all()
+            software_details = f"""No specific software was mentioned in the question.
+        
+        Lowest usage software:
+{format_software_context(lowest_usage)}
+        
+        Next renewals:
+{format_software_context(next_renewals)}"""
+
+        # Create system message with context
+        system_message = f"""You are SAMurAI, an AI assistant for Software Asset Management. 
+        Here is the current state of the software assets:
+        
+        Overview:
+        - Total Software: {context['total_software']}
+        - Total Licenses: {context['total_licenses']}
+        - Used Licenses: {context['used_licenses']}
+        - Licenses Expiring in 30 days: {context['expiring_soon']}
+        - Expired Licenses: {context['expired']}
+        - High Usage Software (>80%): {context['high_usage']}
+        - Low Usage Software (<30%): {context['low_usage']}
+        
+        {software_details}
+        
+        Provide specific, data-driven insights and recommendations based on this information.
+        
+        When discussing costs, always format them as currency with $ symbol and commas.
+        When discussing percentages, always include the % symbol and use one decimal place.
+        Be concise but informative in your responses."""
+
+        # Call OpenAI API
+        response = get_openai_client().chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": message}
+            ],
+            max_tokens=250,
+            temperature=0.7
+        )
+
+        ai_response = response.choices[0].message.content
+        return jsonify({'response': ai_response})
+
+    except Exception as e:
+        logger.error(f"Error in AI chat: {e}")
+        return jsonify({'error': 'An error occurred processing your request'}), 500
+
+# Initialize database when running the app
+if __name__ == '__main__':
+    init_db()  # Initialize database and create admin user
+    # Debugger and reloader only on request; see README for serving with Gunicorn
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1') 
\ No newline at end of file
@@ -7,5 +7,9 @@ OPENAI_API_KEY = 'your-openai-api-key-here'
 # Flask Configuration
 SECRET_KEY = 'your-secret-key-here'  # Generate a secure random key for production
 
+# Password hashing (Werkzeug method string, scrypt:N:r:p)
+# Raise N for a higher cost per login; existing hashes are upgraded on next login
+PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+
 # Database Configuration
 DATABASE_PATH = 'instance/samurai.db'  # Relative path from the project root 
\ No newline at end of file